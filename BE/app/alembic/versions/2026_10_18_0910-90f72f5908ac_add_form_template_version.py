@@ -0,0 +1,143 @@
+"""add form template version
+
+Revision ID: 90f72f5908ac
+Revises: 575346a5baa8, 842211930fe4
+Create Date: 2026-10-18 09:10:42.118504
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '90f72f5908ac'
+down_revision: Union[str, Sequence[str], None] = ('575346a5baa8', '842211930fe4')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Version counter checked by every worker's template cache
+    op.add_column('form_template', sa.Column(
+        'version', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+    # Any direct update of a template bumps its version
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_form_template_version()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.version = OLD.version THEN
+                NEW.version = OLD.version + 1;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER bump_form_template_version
+        BEFORE UPDATE ON form_template
+        FOR EACH ROW
+        EXECUTE FUNCTION bump_form_template_version();
+    """)
+
+    # Changes to sections bump the owning template
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_form_template_version_from_section()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE form_template SET version = version + 1
+                WHERE id = NEW.form_template_id;
+            END IF;
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE'
+                AND OLD.form_template_id IS DISTINCT FROM NEW.form_template_id) THEN
+                UPDATE form_template SET version = version + 1
+                WHERE id = OLD.form_template_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER bump_form_template_version_from_section
+        AFTER INSERT OR UPDATE OR DELETE ON form_template_section
+        FOR EACH ROW
+        EXECUTE FUNCTION bump_form_template_version_from_section();
+    """)
+
+    # Changes to fields bump the template of their section
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_form_template_version_from_field()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE form_template SET version = version + 1
+                WHERE id = (SELECT form_template_id FROM form_template_section
+                            WHERE id = NEW.section_id);
+            END IF;
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE'
+                AND OLD.section_id IS DISTINCT FROM NEW.section_id) THEN
+                UPDATE form_template SET version = version + 1
+                WHERE id = (SELECT form_template_id FROM form_template_section
+                            WHERE id = OLD.section_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER bump_form_template_version_from_field
+        AFTER INSERT OR UPDATE OR DELETE ON form_template_field
+        FOR EACH ROW
+        EXECUTE FUNCTION bump_form_template_version_from_field();
+    """)
+
+    # Changes to options bump the template of their field's section
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_form_template_version_from_option()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE form_template SET version = version + 1
+                WHERE id = (SELECT s.form_template_id
+                            FROM form_template_field f
+                            JOIN form_template_section s ON s.id = f.section_id
+                            WHERE f.id = NEW.field_id);
+            END IF;
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE'
+                AND OLD.field_id IS DISTINCT FROM NEW.field_id) THEN
+                UPDATE form_template SET version = version + 1
+                WHERE id = (SELECT s.form_template_id
+                            FROM form_template_field f
+                            JOIN form_template_section s ON s.id = f.section_id
+                            WHERE f.id = OLD.field_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    op.execute("""
+        CREATE TRIGGER bump_form_template_version_from_option
+        AFTER INSERT OR UPDATE OR DELETE ON form_template_field_option
+        FOR EACH ROW
+        EXECUTE FUNCTION bump_form_template_version_from_option();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "DROP TRIGGER IF EXISTS bump_form_template_version_from_option ON form_template_field_option")
+    op.execute(
+        "DROP TRIGGER IF EXISTS bump_form_template_version_from_field ON form_template_field")
+    op.execute(
+        "DROP TRIGGER IF EXISTS bump_form_template_version_from_section ON form_template_section")
+    op.execute(
+        "DROP TRIGGER IF EXISTS bump_form_template_version ON form_template")
+    op.execute("DROP FUNCTION IF EXISTS bump_form_template_version_from_option()")
+    op.execute("DROP FUNCTION IF EXISTS bump_form_template_version_from_field()")
+    op.execute("DROP FUNCTION IF EXISTS bump_form_template_version_from_section()")
+    op.execute("DROP FUNCTION IF EXISTS bump_form_template_version()")
+
+    op.drop_column('form_template', 'version')
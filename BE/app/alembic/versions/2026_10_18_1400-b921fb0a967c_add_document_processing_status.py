@@ -0,0 +1,44 @@
+"""add document processing status
+
+Revision ID: b921fb0a967c
+Revises: 90f72f5908ac
+Create Date: 2026-10-18 14:00:12.407215
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b921fb0a967c'
+down_revision: Union[str, Sequence[str], None] = '90f72f5908ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('document', sa.Column(
+        'processing_status',
+        sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED',
+                name='documentprocessingstatus', native_enum=False),
+        server_default=sa.text("'PENDING'"),
+        nullable=False))
+    op.add_column('document', sa.Column(
+        'processing_attempts', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('document', sa.Column(
+        'processing_error', sa.Text(), nullable=True))
+
+    # Existing documents were processed inline at upload time
+    op.execute("UPDATE document SET processing_status = 'COMPLETED'")
+
+    op.create_index(op.f('ix_document_processing_status'),
+                    'document', ['processing_status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_processing_status'), table_name='document')
+    op.drop_column('document', 'processing_error')
+    op.drop_column('document', 'processing_attempts')
+    op.drop_column('document', 'processing_status')
@@ -0,0 +1,33 @@
+"""add document content sha256
+
+Revision ID: 77945af9c7c0
+Revises: b921fb0a967c
+Create Date: 2026-10-18 15:30:41.118204
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '77945af9c7c0'
+down_revision: Union[str, Sequence[str], None] = 'b921fb0a967c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('document', sa.Column(
+        'content_sha256', sa.String(length=64), nullable=True))
+    op.add_column('document', sa.Column(
+        'storage_path', sa.String(length=1024), nullable=True))
+    op.create_index(op.f('ix_document_content_sha256'),
+                    'document', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_content_sha256'), table_name='document')
+    op.drop_column('document', 'storage_path')
+    op.drop_column('document', 'content_sha256')
@@ -0,0 +1,56 @@
+"""add wage data version
+
+Revision ID: f55acf59fcbd
+Revises: 77945af9c7c0
+Create Date: 2026-10-18 16:30:07.530912
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f55acf59fcbd'
+down_revision: Union[str, Sequence[str], None] = '77945af9c7c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+WAGE_TABLES = ('wage_area', 'wage_zip_area', 'wage_job', 'wage_area_job')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Version counter checked by every worker's in-memory wage index
+    op.create_table(
+        'wage_data_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("INSERT INTO wage_data_version (id, version) VALUES (1, 0)")
+
+    # One bump per statement, so a bulk import moves the version once
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_wage_data_version()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE wage_data_version SET version = version + 1 WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+    """)
+    for table in WAGE_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER bump_wage_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION bump_wage_data_version();
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in WAGE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS bump_wage_data_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_wage_data_version()")
+    op.drop_table('wage_data_version')
@@ -0,0 +1,28 @@
+"""drop wage zip area zip unique
+
+Revision ID: 8d4b6f1a2c37
+Revises: f55acf59fcbd
+Create Date: 2026-10-18 17:00:12.641093
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4b6f1a2c37'
+down_revision: Union[str, Sequence[str], None] = 'f55acf59fcbd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A zip may span several wage areas (uq_wage_zip_area_zip_area_id stays)
+    op.execute("ALTER TABLE wage_zip_area DROP CONSTRAINT IF EXISTS wage_zip_area_zip_key")
+    op.create_index(op.f('ix_wage_zip_area_zip'), 'wage_zip_area', ['zip'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_wage_zip_area_zip'), table_name='wage_zip_area')
+    op.create_unique_constraint('wage_zip_area_zip_key', 'wage_zip_area', ['zip'])
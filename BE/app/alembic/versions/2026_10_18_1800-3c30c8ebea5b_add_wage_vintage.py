@@ -0,0 +1,84 @@
+"""add wage vintage
+
+Revision ID: 3c30c8ebea5b
+Revises: 8d4b6f1a2c37
+Create Date: 2026-10-18 18:00:26.913571
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3c30c8ebea5b'
+down_revision: Union[str, Sequence[str], None] = '8d4b6f1a2c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'wage_vintage',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('effective_date', sa.Date(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_index('uq_wage_vintage_is_active', 'wage_vintage', ['is_active'],
+                    unique=True, postgresql_where=sa.text('is_active'))
+
+    # Existing wage rows become the active "legacy" vintage
+    op.execute("INSERT INTO wage_vintage (name, is_active) VALUES ('legacy', true)")
+
+    for table, old_constraint, new_constraint, columns in (
+        ('wage_zip_area', 'uq_wage_zip_area_zip_area_id',
+         'uq_wage_zip_area_vintage_id_zip_area_id', ['vintage_id', 'zip', 'area_id']),
+        ('wage_area_job', 'uq_wage_area_job_area_id_job_id',
+         'uq_wage_area_job_vintage_id_area_id_job_id', ['vintage_id', 'area_id', 'job_id']),
+    ):
+        op.add_column(table, sa.Column('vintage_id', sa.Integer(), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET vintage_id = (SELECT id FROM wage_vintage WHERE name = 'legacy')")
+        op.alter_column(table, 'vintage_id', nullable=False)
+        op.create_foreign_key(op.f(f'{table}_vintage_id_fkey'), table,
+                              'wage_vintage', ['vintage_id'], ['id'])
+        op.drop_constraint(old_constraint, table, type_='unique')
+        op.create_unique_constraint(new_constraint, table, columns)
+
+    # Switching the active vintage reloads every worker's wage index
+    op.execute("""
+        CREATE TRIGGER bump_wage_data_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON wage_vintage
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION bump_wage_data_version();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS bump_wage_data_version ON wage_vintage")
+
+    # Only the active vintage's rows survive the downgrade
+    for table, old_constraint, new_constraint, columns in (
+        ('wage_zip_area', 'uq_wage_zip_area_zip_area_id',
+         'uq_wage_zip_area_vintage_id_zip_area_id', ['zip', 'area_id']),
+        ('wage_area_job', 'uq_wage_area_job_area_id_job_id',
+         'uq_wage_area_job_vintage_id_area_id_job_id', ['area_id', 'job_id']),
+    ):
+        op.execute(
+            f"DELETE FROM {table} WHERE vintage_id IS DISTINCT FROM "
+            "(SELECT id FROM wage_vintage WHERE is_active)")
+        op.drop_constraint(new_constraint, table, type_='unique')
+        op.create_unique_constraint(old_constraint, table, columns)
+        op.drop_constraint(op.f(f'{table}_vintage_id_fkey'), table, type_='foreignkey')
+        op.drop_column(table, 'vintage_id')
+
+    op.drop_index('uq_wage_vintage_is_active', table_name='wage_vintage')
+    op.drop_table('wage_vintage')
@@ -0,0 +1,38 @@
+"""add soc inference
+
+Revision ID: 5e1d7a2c9b40
+Revises: 3c30c8ebea5b
+Create Date: 2026-10-18 19:00:41.208417
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1d7a2c9b40'
+down_revision: Union[str, Sequence[str], None] = '3c30c8ebea5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'soc_inference',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('content_sha256', sa.String(length=64), nullable=False),
+        sa.Column('classifier_version', sa.String(length=50), nullable=False),
+        sa.Column('soc_code', sa.String(length=15), nullable=False),
+        sa.Column('job_description', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('content_sha256', 'classifier_version',
+                            name='uq_soc_inference_content_sha256_classifier_version'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('soc_inference')
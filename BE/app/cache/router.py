@@ -15,16 +15,16 @@ async def clear_cache(
     """
     Clear all server-side caches.
     This removes all cached form template data from memory.
+
+    Only clears the worker that handles the request. Template changes in the
+    database are picked up by every worker automatically through the
+    form template version check.
     """
     try:
         from app.forms import cache
 
         # Clear all cache dictionaries
-        with cache._cache_lock:
-            cache._template_fields_cache.clear()
-            cache._field_options_cache.clear()
-            cache._sections_cache.clear()
-            cache._form_template_sections_cache.clear()
+        cache.clear()
 
         logger.info("All caches cleared successfully")
         return {
@@ -33,7 +33,9 @@ async def clear_cache(
                 "template_fields",
                 "field_options",
                 "sections",
-                "form_template_sections"
+                "form_template_sections",
+                "compiled_dependencies",
+                "dependency_graphs",
             ]
         }
     except Exception as e:
@@ -50,17 +52,14 @@ async def sync_cache(
     This clears the cache and forces fresh data to be loaded on next request.
 
     Note: The cache will be automatically repopulated when form data is requested.
-    This endpoint is useful after database changes to template data.
+    Template changes are detected automatically via form_template.version, so
+    this is only needed to force a reload of the handling worker.
     """
     try:
         from app.forms import cache
 
         # Clear all caches
-        with cache._cache_lock:
-            cache._template_fields_cache.clear()
-            cache._field_options_cache.clear()
-            cache._sections_cache.clear()
-            cache._form_template_sections_cache.clear()
+        cache.clear()
 
         logger.info(
             "Cache synced with database (cleared and ready for refresh)")
@@ -80,18 +79,13 @@ async def cache_status(
 ):
     """
     Get current cache statistics.
-    Shows how many items are currently cached.
+    Shows entries, hits, misses, evictions and approximate memory per cache
+    for the worker that handles the request.
     """
     try:
         from app.forms import cache
 
-        with cache._cache_lock:
-            stats = {
-                "template_fields_sections_cached": len(cache._template_fields_cache),
-                "field_options_cached": len(cache._field_options_cache),
-                "sections_cached": len(cache._sections_cache),
-                "form_templates_cached": len(cache._form_template_sections_cache),
-            }
+        stats = cache.stats()
 
         logger.info(f"Cache status: {stats}")
         return {
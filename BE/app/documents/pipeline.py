@@ -0,0 +1,212 @@
+"""
+Background pipeline for document vision processing.
+
+Uploads only store the file and enqueue the document id; a pool of worker
+tasks then runs classification, extraction and workflow evaluation
+(documents.service.process_document). The state lives on the Document row:
+
+    PENDING -> PROCESSING -> COMPLETED
+                          -> PENDING (retry with exponential backoff)
+                          -> FAILED  (after DOCUMENT_PROCESSING_MAX_ATTEMPTS)
+
+Documents are claimed with a conditional UPDATE, so several API workers can
+share the table. On startup every PENDING document, and every PROCESSING one
+not touched for DOCUMENT_PROCESSING_STALE_SECONDS (its worker died), is
+enqueued again.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import and_, or_
+from app.database import SessionLocal
+from app.models import Document, DocumentProcessingStatus
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger("uvicorn.error")
+
+DOCUMENT_PROCESSING_WORKERS = int(os.getenv("DOCUMENT_PROCESSING_WORKERS", "4"))
+DOCUMENT_PROCESSING_MAX_ATTEMPTS = int(
+    os.getenv("DOCUMENT_PROCESSING_MAX_ATTEMPTS", "3")
+)
+# Delay before the first retry, doubled for each further attempt
+DOCUMENT_PROCESSING_BACKOFF_SECONDS = float(
+    os.getenv("DOCUMENT_PROCESSING_BACKOFF_SECONDS", "5")
+)
+DOCUMENT_PROCESSING_STALE_SECONDS = int(
+    os.getenv("DOCUMENT_PROCESSING_STALE_SECONDS", "600")
+)
+
+_queue: Optional[asyncio.Queue] = None
+_workers: list[asyncio.Task] = []
+# Strong references to scheduled retries, so they aren't collected
+_retries: set[asyncio.Task] = set()
+
+
+def enqueue(document_id: int) -> None:
+    """Queue a document for processing (starts the workers if needed)"""
+    if _queue is None:
+        _start_workers()
+    _queue.put_nowait(document_id)
+
+
+async def start() -> None:
+    """Start the workers and re-enqueue documents left unprocessed by a previous run"""
+    _start_workers()
+    await recover()
+
+
+def _start_workers() -> None:
+    global _queue
+    if _queue is not None:
+        return
+    _queue = asyncio.Queue()
+    for index in range(DOCUMENT_PROCESSING_WORKERS):
+        _workers.append(
+            asyncio.create_task(_worker(), name=f"document-pipeline-{index}")
+        )
+    logger.info(f"Document pipeline started ({DOCUMENT_PROCESSING_WORKERS} workers)")
+
+
+async def stop() -> None:
+    """Cancel workers and scheduled retries; unfinished documents are recovered on next start"""
+    global _queue
+    tasks = _workers + list(_retries)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _workers.clear()
+    _retries.clear()
+    _queue = None
+
+
+def _find_unfinished() -> list[int]:
+    db = SessionLocal()
+    try:
+        stale_before = datetime.now(timezone.utc) - timedelta(
+            seconds=DOCUMENT_PROCESSING_STALE_SECONDS
+        )
+        rows = (
+            db.query(Document.id)
+            .filter(
+                or_(
+                    Document.processing_status == DocumentProcessingStatus.PENDING,
+                    and_(
+                        Document.processing_status
+                        == DocumentProcessingStatus.PROCESSING,
+                        Document.updated_at < stale_before,
+                    ),
+                )
+            )
+            .order_by(Document.id)
+            .all()
+        )
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
+async def recover() -> int:
+    """Enqueue documents left unprocessed by a previous run"""
+    document_ids = await asyncio.to_thread(_find_unfinished)
+    for document_id in document_ids:
+        enqueue(document_id)
+    if document_ids:
+        logger.info(f"Re-enqueued {len(document_ids)} unprocessed documents")
+    return len(document_ids)
+
+
+async def _worker() -> None:
+    while True:
+        document_id = await _queue.get()
+        try:
+            await _process(document_id)
+        except Exception as e:
+            logger.error(f"Document pipeline error for document {document_id}: {e}")
+        finally:
+            _queue.task_done()
+
+
+def _claim(db, document_id: int) -> bool:
+    """Atomically move a document to PROCESSING; False if another worker has it"""
+    stale_before = datetime.now(timezone.utc) - timedelta(
+        seconds=DOCUMENT_PROCESSING_STALE_SECONDS
+    )
+    claimed = (
+        db.query(Document)
+        .filter(
+            Document.id == document_id,
+            or_(
+                Document.processing_status == DocumentProcessingStatus.PENDING,
+                and_(
+                    Document.processing_status == DocumentProcessingStatus.PROCESSING,
+                    Document.updated_at < stale_before,
+                ),
+            ),
+        )
+        .update(
+            {
+                Document.processing_status: DocumentProcessingStatus.PROCESSING,
+                Document.processing_attempts: Document.processing_attempts + 1,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return bool(claimed)
+
+
+async def _process(document_id: int) -> None:
+    from app.documents.service import process_document
+
+    db = SessionLocal()
+    try:
+        if not _claim(db, document_id):
+            return
+        document = db.query(Document).filter(Document.id == document_id).first()
+
+        try:
+            document = await process_document(db=db, document=document)
+        except Exception as e:
+            db.rollback()
+            _record_failure(db, document_id, e)
+            return
+
+        document.processing_status = DocumentProcessingStatus.COMPLETED
+        document.processing_error = None
+        db.commit()
+        logger.info(f"Document {document_id} processed")
+    finally:
+        db.close()
+
+
+def _record_failure(db, document_id: int, error: Exception) -> None:
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        return
+
+    document.processing_error = str(error)[:2000]
+    if document.processing_attempts >= DOCUMENT_PROCESSING_MAX_ATTEMPTS:
+        document.processing_status = DocumentProcessingStatus.FAILED
+        db.commit()
+        logger.error(
+            f"Document {document_id} failed after {document.processing_attempts} attempts: {error}"
+        )
+        return
+
+    document.processing_status = DocumentProcessingStatus.PENDING
+    db.commit()
+    delay = DOCUMENT_PROCESSING_BACKOFF_SECONDS * 2 ** (document.processing_attempts - 1)
+    logger.warning(
+        f"Document {document_id} attempt {document.processing_attempts} failed, "
+        f"retrying in {delay:g}s: {error}"
+    )
+    task = asyncio.create_task(_retry_later(document_id, delay))
+    _retries.add(task)
+    task.add_done_callback(_retries.discard)
+
+
+async def _retry_later(document_id: int, delay: float) -> None:
+    await asyncio.sleep(delay)
+    enqueue(document_id)
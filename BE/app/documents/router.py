@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
 from app.auth.service import get_project_state
 from app.models import ProjectState
-from app.schemas import DocumentPublic, DocumentsPublic, DocumentTypesPublic
+from app.schemas import (
+    DocumentPublic,
+    DocumentsPublic,
+    DocumentTypesPublic,
+    DocumentUploadRequest,
+    DocumentUploadPublic,
+    DocumentUrlPublic,
+)
 from app.documents import service as document_service
-import io
+from app.documents.storage import LocalStorage, storage, verify_local_token
+import uuid
 
 router = APIRouter()
+# Signed-token endpoints standing in for S3 presigned URLs with LocalStorage
+storage_router = APIRouter()
 
 
 @router.get("", response_model=DocumentsPublic)
@@ -35,9 +45,40 @@ async def get_document_types(project_state: ProjectState = Depends(get_project_s
         )
 
 
+def parse_range_header(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range "bytes=start-end" header into inclusive offsets.
+    Returns None when there is no usable range (missing, malformed or
+    multi-range headers are answered with the full file).
+    Raises:
+        ValueError: The range lies outside the file.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+    first, last = spec.split("-", 1)
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # suffix range: the last N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise ValueError("Requested range not satisfiable")
+    return start, end
+
+
 @router.get("/{document_uuid}")
 async def download_document(
-    document_uuid: str, project_state: ProjectState = Depends(get_project_state)
+    document_uuid: str,
+    request: Request,
+    project_state: ProjectState = Depends(get_project_state),
 ):
     """Stream document blob content"""
     try:
@@ -53,30 +94,59 @@ async def download_document(
                 status_code=404, detail="Document not found in this project"
             )
 
-        # Get file bytes from storage
-        file_bytes = await document_service.get_document_blob(
+        media_type = document.content_type or "application/octet-stream"
+
+        # Local files are served by FileResponse (handles Range itself)
+        local_path = document_service.get_document_local_path(
             document=document, project=project_state.project
         )
+        if local_path:
+            return FileResponse(
+                local_path, media_type=media_type, filename=document.name
+            )
 
-        # Create a streaming response
-        async def stream_content():
-            """Stream file in chunks"""
-            chunk_size = 8192  # 8KB chunks
-            file_stream = io.BytesIO(file_bytes)
-
-            while chunk := file_stream.read(chunk_size):
-                yield chunk
-
-        # Return streaming response with appropriate headers
-        return StreamingResponse(
-            stream_content(),
-            media_type=document.content_type or "application/octet-stream",
-            headers={
-                "Content-Disposition": f'attachment; filename="{document.name}"',
-                "Content-Length": str(len(file_bytes)),
-            },
+        file_stat = await document_service.stat_document_blob(
+            document=document, project=project_state.project
         )
+        headers = {
+            "Content-Disposition": f'attachment; filename="{document.name}"',
+            "Accept-Ranges": "bytes",
+            "ETag": file_stat.etag,
+        }
 
+        # Partial download: a single "bytes=start-end" range
+        try:
+            byte_range = parse_range_header(
+                request.headers.get("range"), file_stat.size
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=416,
+                detail=str(e),
+                headers={"Content-Range": f"bytes */{file_stat.size}"},
+            )
+        if byte_range:
+            start, end = byte_range
+            content = await document_service.stream_document_blob(
+                document=document, project=project_state.project, start=start, end=end
+            )
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_stat.size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                content, status_code=206, media_type=media_type, headers=headers
+            )
+
+        # Stream file chunks straight from storage
+        content = await document_service.stream_document_blob(
+            document=document, project=project_state.project
+        )
+        headers["Content-Length"] = str(file_stat.size)
+        return StreamingResponse(content, media_type=media_type, headers=headers)
+
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to retrieve file: {str(e)}"
@@ -97,3 +167,100 @@ async def create_document(
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+
+
+@router.post("/uploads", response_model=DocumentUploadPublic)
+async def initiate_document_upload(
+    upload_request: DocumentUploadRequest,
+    project_state: ProjectState = Depends(get_project_state),
+):
+    """Get a presigned URL to upload a document's content directly to storage"""
+    try:
+        return await document_service.initiate_upload(
+            project=project_state.project,
+            name=upload_request.name,
+            content_type=upload_request.content_type,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+
+
+@router.post("/uploads/{public_id}/complete", response_model=DocumentPublic)
+async def complete_document_upload(
+    public_id: uuid.UUID,
+    upload_request: DocumentUploadRequest,
+    project_state: ProjectState = Depends(get_project_state),
+):
+    """Create the document for a finished direct upload and process it"""
+    try:
+        return await document_service.complete_upload(
+            db=project_state.db,
+            project=project_state.project,
+            public_id=public_id,
+            name=upload_request.name,
+            content_type=upload_request.content_type,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+
+
+@router.get("/{document_uuid}/url", response_model=DocumentUrlPublic)
+async def get_document_url(
+    document_uuid: str, project_state: ProjectState = Depends(get_project_state)
+):
+    """Get a presigned URL to download a document directly from storage"""
+    document = await document_service.get_by_public_id(
+        db=project_state.db,
+        project=project_state.project,
+        document_uuid=document_uuid,
+    )
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found in this project")
+
+    try:
+        return await document_service.get_download_url(
+            document=document, project=project_state.project
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create download URL: {str(e)}"
+        )
+
+
+def _verify_local_storage_token(token: str, method: str) -> dict:
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    try:
+        return verify_local_token(token, method)
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+
+@storage_router.put("/{token}")
+async def upload_local_storage_file(token: str, request: Request):
+    """Receive a direct upload for a LocalStorage presigned upload URL"""
+    claims = _verify_local_storage_token(token, "PUT")
+    if claims.get("content_type") and request.headers.get("content-type") != claims["content_type"]:
+        raise HTTPException(status_code=403, detail="Content type does not match the upload URL")
+
+    await storage.save_stream(request.stream(), claims["path"])
+    file_stat = await storage.stat(claims["path"])
+    return Response(status_code=200, headers={"ETag": file_stat.etag})
+
+
+@storage_router.get("/{token}")
+async def download_local_storage_file(token: str):
+    """Serve a LocalStorage presigned download URL"""
+    claims = _verify_local_storage_token(token, "GET")
+    local_path = storage.local_path(claims["path"])
+    if not local_path:
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(
+        local_path,
+        media_type=claims.get("content_type") or "application/octet-stream",
+        filename=claims.get("filename"),
+    )
@@ -1,9 +1,20 @@
 from sqlalchemy.orm import Session as DBSession
-from app.models import Document, DocumentType, Project
-from app.documents.storage import storage
+from app.models import Document, DocumentProcessingStatus, DocumentType, Project
+from app.schemas import DocumentUploadPublic, DocumentUrlPublic
+from app.documents.storage import (
+    storage,
+    FileStat,
+    PRESIGNED_URL_EXPIRES_SECONDS,
+    STREAM_CHUNK_SIZE,
+)
 from app.documents.vision_service import vision_service
+from app.documents import pipeline as document_pipeline
 from fastapi import UploadFile
+from pathlib import Path
+from typing import AsyncIterator
+import hashlib
 import logging
+import uuid
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -36,9 +47,21 @@ async def get_by_public_id(
     )
 
 
+def get_upload_path(*, project: Project, public_id: uuid.UUID) -> str:
+    """Storage path of the uploaded file of a document public ID"""
+    return f"documents/{project.client.public_id}/{project.public_id}/uploads/{public_id}"
+
+
+def get_document_path(*, document: Document, project: Project) -> str:
+    """Storage path of a document's uploaded file"""
+    if document.storage_path:
+        return document.storage_path
+    return get_upload_path(project=project, public_id=document.public_id)
+
+
 async def get_document_blob(*, document: Document, project: Project) -> bytes:
     """Get document blob from storage"""
-    file_path = f"documents/{project.client.public_id}/{project.public_id}/uploads/{document.public_id}"
+    file_path = get_document_path(document=document, project=project)
 
     try:
         return await storage.get_file(file_path)
@@ -46,8 +69,87 @@ async def get_document_blob(*, document: Document, project: Project) -> bytes:
         raise
 
 
+async def hash_document_blob(*, document: Document, project: Project) -> str:
+    """SHA-256 of a stored document's content, streamed rather than loaded at once"""
+    digest = hashlib.sha256()
+    async for chunk in storage.stream_file(
+        get_document_path(document=document, project=project)
+    ):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_document_local_path(*, document: Document, project: Project) -> Path | None:
+    """Filesystem path of the document blob when storage is local"""
+    return storage.local_path(get_document_path(document=document, project=project))
+
+
+async def stat_document_blob(*, document: Document, project: Project) -> FileStat:
+    """Get size and ETag of a document blob"""
+    file_path = get_document_path(document=document, project=project)
+    return await storage.stat(file_path)
+
+
+async def stream_document_blob(
+    *, document: Document, project: Project, start: int = 0, end: int | None = None
+) -> AsyncIterator[bytes]:
+    """Stream document blob (or bytes start..end inclusive) from storage in chunks"""
+    file_path = get_document_path(document=document, project=project)
+    return await storage.open_stream(file_path, start=start, end=end)
+
+
+async def iter_upload_file(file: UploadFile) -> AsyncIterator[bytes]:
+    """Read an upload in chunks instead of loading it into memory at once"""
+    while chunk := await file.read(STREAM_CHUNK_SIZE):
+        yield chunk
+
+
+async def hash_upload_file(file: UploadFile) -> str:
+    """SHA-256 of an upload's content, leaving the file rewound for saving"""
+    digest = hashlib.sha256()
+    async for chunk in iter_upload_file(file):
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+
+def find_stored_duplicate(
+    *, db: DBSession, project: Project, content_sha256: str
+) -> Document | None:
+    """Earliest document of the project with the same content already in storage"""
+    return (
+        db.query(Document)
+        .filter(
+            Document.project_id == project.id,
+            Document.content_sha256 == content_sha256,
+        )
+        .order_by(Document.id.asc())
+        .first()
+    )
+
+
+def find_processed_duplicate(*, db: DBSession, document: Document) -> Document | None:
+    """
+    Latest classified document of the same client with the same content, whose
+    vision result can be reused. Never looks at other clients' documents.
+    """
+    return (
+        db.query(Document)
+        .join(Project, Document.project_id == Project.id)
+        .filter(
+            Project.client_id == document.project.client_id,
+            Document.content_sha256 == document.content_sha256,
+            Document.id != document.id,
+            Document.processing_status == DocumentProcessingStatus.COMPLETED,
+            Document.inferred_type_id.isnot(None),
+        )
+        .order_by(Document.id.desc())
+        .first()
+    )
+
+
 async def create(*, db: DBSession, project: Project, file: UploadFile) -> Document:
-    """Create a new document with file upload and vision processing"""
+    """Create a new document with file upload, vision processing is queued"""
     if not file.filename:
         raise ValueError("File name is required")
     if not file.content_type:
@@ -55,10 +157,29 @@ async def create(*, db: DBSession, project: Project, file: UploadFile) -> Docume
 
     logger.info(f"Creating document: {file.filename} for project {project.id}")
 
+    # Identical content already uploaded to this project shares its blob
+    content_sha256 = await hash_upload_file(file)
+    duplicate = find_stored_duplicate(
+        db=db, project=project, content_sha256=content_sha256
+    )
+    if duplicate and not await storage.exists(
+        get_document_path(document=duplicate, project=project)
+    ):
+        # Its upload is still in flight (or failed), store our own copy
+        duplicate = None
+
     # Step 1: Create document in database
     try:
         document = Document(
-            project_id=project.id, name=file.filename, content_type=file.content_type
+            project_id=project.id,
+            name=file.filename,
+            content_type=file.content_type,
+            content_sha256=content_sha256,
+            storage_path=(
+                get_document_path(document=duplicate, project=project)
+                if duplicate
+                else None
+            ),
         )
         db.add(document)
         db.commit()
@@ -71,10 +192,16 @@ async def create(*, db: DBSession, project: Project, file: UploadFile) -> Docume
         raise
 
     # Step 2: Save file to storage
+    if duplicate:
+        logger.info(
+            f"Document {document.public_id} has the same content as document "
+            f"{duplicate.public_id}, reusing {document.storage_path}")
+        document_pipeline.enqueue(document.id)
+        return document
+
     try:
-        file_bytes = await file.read()
-        file_path = f"documents/{project.client.public_id}/{project.public_id}/uploads/{document.public_id}"
-        await storage.save_file(file_bytes, file_path)
+        file_path = get_document_path(document=document, project=project)
+        await storage.save_stream(iter_upload_file(file), file_path)
         logger.info(f"File saved to storage: {file_path}")
     except Exception as e:
         # Cleanup: delete the document record since file save failed
@@ -87,54 +214,86 @@ async def create(*, db: DBSession, project: Project, file: UploadFile) -> Docume
             db.rollback()
         raise
 
-    # Step 3: Process with Vision Service
-    try:
-        await file.seek(0)
+    # Step 3-4: Vision processing and workflow evaluation run in the background
+    document_pipeline.enqueue(document.id)
+    return document
+
+
+async def process_document(*, db: DBSession, document: Document) -> Document:
+    """
+    Classify/extract a stored document with the vision service, then
+    re-evaluate the workflow. Runs in the document pipeline; vision or
+    storage failures are raised so the pipeline can retry.
+    """
+    project = document.project
+
+    # Direct uploads are hashed here, the first time their content is read
+    content = None
+    if not document.content_sha256:
+        file_path = get_document_path(document=document, project=project)
+        content = await storage.get_file(file_path)
+        document.content_sha256 = hashlib.sha256(content).hexdigest()
+
+    # Step 3: Process with Vision Service, unless identical content was already classified
+    processed = find_processed_duplicate(db=db, document=document)
+    if processed:
+        logger.info(
+            f"Reusing vision result of document {processed.public_id} (same content)")
+        document.inferred_type_id = processed.inferred_type_id
+        document.extracted_data = processed.extracted_data
+        inferred_type_name = None
+        extracted_data = None
+    else:
+        if content is None:
+            file_path = get_document_path(document=document, project=project)
+            content = await storage.get_file(file_path)
+
         logger.info("Sending document to vision service for processing")
-        processing_result = await vision_service.send_document(file=file, timeout=30.0)
+        processing_result = await vision_service.send_document(
+            filename=document.name,
+            content=content,
+            content_type=document.content_type,
+            timeout=30.0,
+        )
         logger.info(f"Vision service processing result: {processing_result}")
-
-        # Update document with processing result
         inferred_type_name = processing_result.get("inferred_type")
-        if inferred_type_name:
-            # Upsert DocumentType by code
-            doc_type = (
-                db.query(DocumentType)
-                .filter(DocumentType.code == inferred_type_name)
-                .first()
-            )
-            if not doc_type:
-                logger.warning(
-                    f"Document type not found for code: {inferred_type_name}, creating new one")
-                doc_type = DocumentType(
-                    name=inferred_type_name, code=inferred_type_name
-                )
-                db.add(doc_type)
-                db.flush()
-
-            document.inferred_type_id = doc_type.id
-            logger.info(
-                f"Document type set to: {doc_type.name} (ID: {doc_type.id})")
-
         extracted_data = processing_result.get("extracted_data")
-        if extracted_data:
-            document.extracted_data = extracted_data
-            logger.info("Extracted data saved to document")
 
-        db.commit()
-        db.refresh(document)
+    # Update document with processing result
+    if inferred_type_name:
+        # Upsert DocumentType by code
+        doc_type = (
+            db.query(DocumentType)
+            .filter(DocumentType.code == inferred_type_name)
+            .first()
+        )
+        if not doc_type:
+            logger.warning(
+                f"Document type not found for code: {inferred_type_name}, creating new one")
+            doc_type = DocumentType(
+                name=inferred_type_name, code=inferred_type_name
+            )
+            db.add(doc_type)
+            db.flush()
+
+        document.inferred_type_id = doc_type.id
         logger.info(
-            f"Document processing complete. Type ID: {document.inferred_type_id}")
+            f"Document type set to: {doc_type.name} (ID: {doc_type.id})")
 
-    except Exception as vision_error:
-        logger.error(f"Vision processing failed: {str(vision_error)}")
-        # Don't rollback or raise - document is still valid without processing
+    if extracted_data:
+        document.extracted_data = extracted_data
+        logger.info("Extracted data saved to document")
+
+    db.commit()
+    db.refresh(document)
+    logger.info(
+        f"Document processing complete. Type ID: {document.inferred_type_id}")
 
     # Save document_id before evaluation (in case session gets rolled back)
     document_id = document.id
 
     # Step 4: AUTOMATIC WORKFLOW EVALUATION
-    logger.info("Triggering workflow evaluation after document upload")
+    logger.info("Triggering workflow evaluation after document processing")
     try:
         from app.workflow.workflow_evaluator import evaluate_workflow_completion
         evaluation_result = await evaluate_workflow_completion(db=db, project=project)
@@ -147,9 +306,92 @@ async def create(*, db: DBSession, project: Project, file: UploadFile) -> Docume
         document = db.query(Document).filter(
             Document.id == document_id).first()
         if not document:
-            logger.error(
-                f"Could not re-fetch document {document_id} after evaluation failure")
             raise ValueError(
                 f"Document {document_id} not found after workflow evaluation failure")
 
     return document
+
+
+async def initiate_upload(
+    *, project: Project, name: str, content_type: str
+) -> DocumentUploadPublic:
+    """Reserve a document public ID and hand out a URL to upload its content directly"""
+    if not name:
+        raise ValueError("File name is required")
+    if not content_type:
+        raise ValueError("File content type is required")
+
+    public_id = uuid.uuid4()
+    file_path = get_upload_path(project=project, public_id=public_id)
+    upload_url = await storage.presigned_upload_url(
+        file_path, content_type, PRESIGNED_URL_EXPIRES_SECONDS
+    )
+    logger.info(f"Direct upload initiated for document {public_id} in project {project.id}")
+    return DocumentUploadPublic(
+        public_id=public_id,
+        upload_url=upload_url,
+        method="PUT",
+        headers={"Content-Type": content_type},
+        expires_in=PRESIGNED_URL_EXPIRES_SECONDS,
+    )
+
+
+async def complete_upload(
+    *,
+    db: DBSession,
+    project: Project,
+    public_id: uuid.UUID,
+    name: str,
+    content_type: str,
+) -> Document:
+    """Create the document row for a direct upload once its content is in storage, then queue its processing"""
+    if not name:
+        raise ValueError("File name is required")
+    if not content_type:
+        raise ValueError("File content type is required")
+
+    existing = db.query(Document).filter(Document.public_id == public_id).first()
+    if existing:
+        if existing.project_id != project.id:
+            raise ValueError("Document upload not found")
+        return existing
+
+    # The object only exists under this project's prefix if the client uploaded it
+    file_path = get_upload_path(project=project, public_id=public_id)
+    try:
+        await storage.stat(file_path)
+    except FileNotFoundError:
+        raise ValueError("Uploaded file not found, upload the content before completing")
+
+    try:
+        document = Document(
+            public_id=public_id,
+            project_id=project.id,
+            name=name,
+            content_type=content_type,
+        )
+        db.add(document)
+        db.commit()
+        db.refresh(document)
+        logger.info(
+            f"Document created from direct upload with ID: {document.id}, public_id: {document.public_id}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to create document record: {e}")
+        raise
+
+    # Vision processing and workflow evaluation run in the background
+    document_pipeline.enqueue(document.id)
+    return document
+
+
+async def get_download_url(*, document: Document, project: Project) -> DocumentUrlPublic:
+    """Time-limited URL to download a document directly from storage"""
+    file_path = get_document_path(document=document, project=project)
+    url = await storage.presigned_download_url(
+        file_path,
+        PRESIGNED_URL_EXPIRES_SECONDS,
+        filename=document.name,
+        content_type=document.content_type,
+    )
+    return DocumentUrlPublic(url=url, expires_in=PRESIGNED_URL_EXPIRES_SECONDS)
@@ -3,8 +3,21 @@ import dotenv
 from pathlib import Path
 import logging
 from abc import ABC, abstractmethod
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from aiobotocore.config import AioConfig
 import aiofiles
 import aioboto3
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import mmap
+import secrets
+import time
 
 dotenv.load_dotenv()
 
@@ -12,13 +25,45 @@ logger = logging.getLogger(__name__)
 
 S3_STORAGE = os.getenv("S3_STORAGE", "True")
 S3_BUCKET = os.getenv("S3_BUCKET", "default-bucket")
+# Custom endpoint for S3-compatible stores (MinIO, moto_server) in dev/benchmarks
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50"))
 LOCAL_DOCUMENTS_DIR = Path("local_storage")
+STREAM_CHUNK_SIZE = int(os.getenv("STORAGE_STREAM_CHUNK_SIZE", str(64 * 1024)))
+# Streams larger than this are uploaded to S3 in parts (S3 minimum part is 5 MiB)
+MULTIPART_PART_SIZE = max(
+    int(os.getenv("STORAGE_MULTIPART_PART_SIZE", str(8 * 1024 * 1024))),
+    5 * 1024 * 1024,
+)
+
+PRESIGNED_URL_EXPIRES_SECONDS = int(os.getenv("STORAGE_PRESIGNED_URL_EXPIRES_SECONDS", "900"))
+# LocalStorage stand-in for presigned URLs: HMAC-signed tokens served by the API.
+# Without a fixed key, tokens only work on the worker that issued them.
+LOCAL_STORAGE_SIGNING_KEY = os.getenv("LOCAL_STORAGE_SIGNING_KEY") or secrets.token_hex(32)
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "")
+
+
+@dataclass(frozen=True)
+class FileStat:
+    """Size and version of a stored file"""
+
+    size: int
+    etag: str
+    last_modified: Optional[datetime] = None
 
 
 # Use factory pattern to create storage instance for S3 or local storage
 class Storage(ABC):
     """Abstract base class for storage"""
 
+    async def start(self) -> None:
+        """Acquire long-lived resources (called at app startup)"""
+        pass
+
+    async def close(self) -> None:
+        """Release long-lived resources (called at app shutdown)"""
+        pass
+
     @abstractmethod
     async def save_file(self, file_bytes: bytes, path: str) -> None:
         """Save file bytes to storage"""
@@ -29,35 +74,332 @@ class Storage(ABC):
         """Get file from storage"""
         pass
 
+    @abstractmethod
+    async def exists(self, path: str) -> bool:
+        """Check whether a file exists in storage"""
+        pass
+
+    @abstractmethod
+    async def stat(self, path: str) -> FileStat:
+        """Get size and ETag of a file, FileNotFoundError if missing"""
+        pass
+
+    @abstractmethod
+    async def list_files(self, prefix: str) -> list[str]:
+        """Paths of the stored files starting with prefix"""
+        pass
+
+    @abstractmethod
+    async def delete_file(self, path: str) -> None:
+        """Delete a file, a missing file is not an error"""
+        pass
+
+    @abstractmethod
+    async def get_range(self, path: str, start: int, end: int) -> bytes:
+        """Get bytes start..end (inclusive, like HTTP Range) of a file"""
+        pass
+
+    @abstractmethod
+    def stream_file(
+        self,
+        path: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield file content (optionally bytes start..end inclusive) in chunks"""
+        pass
+
+    @abstractmethod
+    async def save_stream(self, chunks: AsyncIterator[bytes], path: str) -> int:
+        """Save a stream of chunks without buffering the whole file, returns size"""
+        pass
+
+    @abstractmethod
+    async def presigned_upload_url(
+        self,
+        path: str,
+        content_type: str,
+        expires_in: int = PRESIGNED_URL_EXPIRES_SECONDS,
+    ) -> str:
+        """Time-limited URL a client can PUT the file content to directly"""
+        pass
+
+    @abstractmethod
+    async def presigned_download_url(
+        self,
+        path: str,
+        expires_in: int = PRESIGNED_URL_EXPIRES_SECONDS,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> str:
+        """Time-limited URL a client can GET the file from directly"""
+        pass
+
+    def local_path(self, path: str) -> Optional[Path]:
+        """Filesystem path of a stored file, if the backend has one"""
+        return None
+
+    async def open_stream(
+        self,
+        path: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Start streaming a file and return the chunk iterator.
+        The first chunk is fetched here, so a missing file raises
+        FileNotFoundError before any response has been started.
+        """
+        chunks = self.stream_file(path, chunk_size, start, end)
+        try:
+            first_chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            first_chunk = b""
+
+        async def primed():
+            try:
+                if first_chunk:
+                    yield first_chunk
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
+
+        return primed()
+
 
 class S3Storage(Storage):
     """S3 storage implementation"""
 
-    def __init__(self, bucket: str, session):
+    def __init__(
+        self,
+        bucket: str,
+        session,
+        endpoint_url: str = None,
+        max_pool_connections: int = S3_MAX_POOL_CONNECTIONS,
+    ):
         self.bucket = bucket
         self.session = session
+        self.endpoint_url = endpoint_url
+        self.max_pool_connections = max_pool_connections
+        # One client (and connection pool) shared by all requests of the worker
+        self._client = None
+        self._exit_stack = None
+        self._client_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        await self._get_client()
+
+    async def close(self) -> None:
+        async with self._client_lock:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+            self._client = None
+            self._exit_stack = None
+
+    async def _get_client(self):
+        """Return the shared S3 client, creating it on first use"""
+        if self._client is not None:
+            return self._client
+        async with self._client_lock:
+            if self._client is None:
+                exit_stack = AsyncExitStack()
+                self._client = await exit_stack.enter_async_context(
+                    self.session.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        config=AioConfig(
+                            max_pool_connections=self.max_pool_connections
+                        ),
+                    )
+                )
+                self._exit_stack = exit_stack
+                logger.info(
+                    f"S3 client started (max {self.max_pool_connections} connections)"
+                )
+            return self._client
 
     async def save_file(self, file_bytes: bytes, path: str) -> None:
         try:
-            async with self.session.client("s3") as s3_client:
-                await s3_client.put_object(
-                    Bucket=self.bucket, Key=path, Body=file_bytes
-                )
-                file_url = f"https://{self.bucket}.s3.amazonaws.com/{path}"
-                logger.info(f"File saved to S3: {file_url}")
+            s3_client = await self._get_client()
+            await s3_client.put_object(Bucket=self.bucket, Key=path, Body=file_bytes)
+            file_url = f"https://{self.bucket}.s3.amazonaws.com/{path}"
+            logger.info(f"File saved to S3: {file_url}")
         except Exception as e:
             logger.error(f"Failed to save file to S3: {e}")
             raise e
 
     async def get_file(self, path: str) -> bytes:
         try:
-            async with self.session.client("s3") as s3_client:
-                response = await s3_client.get_object(Bucket=self.bucket, Key=path)
-                async with response["Body"] as stream:
-                    return await stream.read()
+            s3_client = await self._get_client()
+            response = await s3_client.get_object(Bucket=self.bucket, Key=path)
+            async with response["Body"] as stream:
+                return await stream.read()
+        except Exception as e:
+            logger.error(f"Failed to get file from S3: {e}")
+            raise FileNotFoundError(f"File not found in S3: {path}")
+
+    async def stat(self, path: str) -> FileStat:
+        s3_client = await self._get_client()
+        try:
+            response = await s3_client.head_object(Bucket=self.bucket, Key=path)
+        except s3_client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise FileNotFoundError(f"File not found in S3: {path}")
+            raise
+        return FileStat(
+            size=response["ContentLength"],
+            etag=response["ETag"],
+            last_modified=response.get("LastModified"),
+        )
+
+    async def get_range(self, path: str, start: int, end: int) -> bytes:
+        try:
+            s3_client = await self._get_client()
+            response = await s3_client.get_object(
+                Bucket=self.bucket, Key=path, Range=f"bytes={start}-{end}"
+            )
+            async with response["Body"] as stream:
+                return await stream.read()
+        except Exception as e:
+            logger.error(f"Failed to get file range from S3: {e}")
+            raise FileNotFoundError(f"File not found in S3: {path}")
+
+    async def stream_file(
+        self,
+        path: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        s3_client = await self._get_client()
+        request = {"Bucket": self.bucket, "Key": path}
+        if start or end is not None:
+            request["Range"] = f"bytes={start}-{'' if end is None else end}"
+        try:
+            response = await s3_client.get_object(**request)
         except Exception as e:
             logger.error(f"Failed to get file from S3: {e}")
             raise FileNotFoundError(f"File not found in S3: {path}")
+        body = response["Body"]
+        async with body:
+            async for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+
+    async def exists(self, path: str) -> bool:
+        try:
+            await self.stat(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def list_files(self, prefix: str) -> list[str]:
+        s3_client = await self._get_client()
+        paginator = s3_client.get_paginator("list_objects_v2")
+        paths = []
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            paths.extend(item["Key"] for item in page.get("Contents", []))
+        return paths
+
+    async def delete_file(self, path: str) -> None:
+        s3_client = await self._get_client()
+        await s3_client.delete_object(Bucket=self.bucket, Key=path)
+        logger.info(f"File deleted from S3: {path}")
+
+    async def presigned_upload_url(
+        self,
+        path: str,
+        content_type: str,
+        expires_in: int = PRESIGNED_URL_EXPIRES_SECONDS,
+    ) -> str:
+        s3_client = await self._get_client()
+        return await s3_client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket, "Key": path, "ContentType": content_type},
+            ExpiresIn=expires_in,
+        )
+
+    async def presigned_download_url(
+        self,
+        path: str,
+        expires_in: int = PRESIGNED_URL_EXPIRES_SECONDS,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> str:
+        s3_client = await self._get_client()
+        params = {"Bucket": self.bucket, "Key": path}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        if content_type:
+            params["ResponseContentType"] = content_type
+        return await s3_client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires_in
+        )
+
+    async def save_stream(self, chunks: AsyncIterator[bytes], path: str) -> int:
+        """Single PUT for small streams, multipart upload once a part fills up"""
+        s3_client = await self._get_client()
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+        size = 0
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                size += len(chunk)
+                if len(buffer) < MULTIPART_PART_SIZE:
+                    continue
+                if upload_id is None:
+                    upload = await s3_client.create_multipart_upload(
+                        Bucket=self.bucket, Key=path
+                    )
+                    upload_id = upload["UploadId"]
+                parts.append(await self._upload_part(path, upload_id, parts, buffer))
+                buffer = bytearray()
+
+            if upload_id is None:
+                await s3_client.put_object(
+                    Bucket=self.bucket, Key=path, Body=bytes(buffer)
+                )
+            else:
+                if buffer:
+                    parts.append(
+                        await self._upload_part(path, upload_id, parts, buffer)
+                    )
+                await s3_client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=path,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+            logger.info(f"File saved to S3: {path} ({size} bytes, {len(parts)} parts)")
+            return size
+        except Exception as e:
+            logger.error(f"Failed to save file stream to S3: {e}")
+            if upload_id is not None:
+                try:
+                    await s3_client.abort_multipart_upload(
+                        Bucket=self.bucket, Key=path, UploadId=upload_id
+                    )
+                except Exception as abort_error:
+                    logger.error(f"Failed to abort multipart upload: {abort_error}")
+            raise
+
+    async def _upload_part(
+        self, path: str, upload_id: str, parts: list, buffer: bytearray
+    ) -> dict:
+        s3_client = await self._get_client()
+        part_number = len(parts) + 1
+        response = await s3_client.upload_part(
+            Bucket=self.bucket,
+            Key=path,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=bytes(buffer),
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
 
 
 class LocalStorage(Storage):
@@ -66,15 +408,27 @@ class LocalStorage(Storage):
     def __init__(self, base_dir: Path):
         self.base_dir = base_dir
 
+    @staticmethod
+    def _partial_path(file_path: Path) -> Path:
+        # Writes go next to the target and are renamed over it, so readers never
+        # see a partial file. Unique per write, as concurrent saves (re-rendered
+        # PDFs, retried uploads) may target the same path.
+        return file_path.with_name(
+            f"{file_path.name}.{secrets.token_hex(8)}.partial"
+        )
+
     async def save_file(self, file_bytes: bytes, path: str) -> None:
+        file_path = self.base_dir / path
+        partial_path = self._partial_path(file_path)
         try:
-            file_path = self.base_dir / path
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            async with aiofiles.open(file_path, "wb") as f:
+            async with aiofiles.open(partial_path, "wb") as f:
                 await f.write(file_bytes)
+            os.replace(partial_path, file_path)
             logger.info(f"File saved to local: {file_path}")
         except Exception as e:
             logger.error(f"Failed to save file to local: {e}")
+            partial_path.unlink(missing_ok=True)
             raise e
 
     async def get_file(self, path: str) -> bytes:
@@ -84,6 +438,163 @@ class LocalStorage(Storage):
         async with aiofiles.open(file_path, "rb") as f:
             return await f.read()
 
+    async def stat(self, path: str) -> FileStat:
+        file_path = self.base_dir / path
+        try:
+            file_stat = await asyncio.to_thread(os.stat, file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {path}")
+        return FileStat(
+            size=file_stat.st_size,
+            etag=f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"',
+            last_modified=datetime.fromtimestamp(file_stat.st_mtime),
+        )
+
+    async def get_range(self, path: str, start: int, end: int) -> bytes:
+        file_path = self.base_dir / path
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+
+        def read_range() -> bytes:
+            with open(file_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[start:end + 1]
+
+        return await asyncio.to_thread(read_range)
+
+    async def stream_file(
+        self,
+        path: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        file_path = self.base_dir / path
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+        async with aiofiles.open(file_path, "rb") as f:
+            if start:
+                await f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def exists(self, path: str) -> bool:
+        return (self.base_dir / path).is_file()
+
+    async def list_files(self, prefix: str) -> list[str]:
+        directory, _, name_prefix = prefix.rpartition("/")
+        directory_path = self.base_dir / directory
+        if not directory_path.is_dir():
+            return []
+        return [
+            f"{directory}/{entry.name}" if directory else entry.name
+            for entry in directory_path.iterdir()
+            if entry.is_file()
+            and entry.name.startswith(name_prefix)
+            and not entry.name.endswith(".partial")
+        ]
+
+    async def delete_file(self, path: str) -> None:
+        file_path = self.base_dir / path
+        file_path.unlink(missing_ok=True)
+        logger.info(f"File deleted from local: {file_path}")
+
+    async def save_stream(self, chunks: AsyncIterator[bytes], path: str) -> int:
+        file_path = self.base_dir / path
+        partial_path = self._partial_path(file_path)
+        size = 0
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(partial_path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+                    size += len(chunk)
+            os.replace(partial_path, file_path)
+            logger.info(f"File saved to local: {file_path} ({size} bytes)")
+            return size
+        except Exception as e:
+            logger.error(f"Failed to save file stream to local: {e}")
+            partial_path.unlink(missing_ok=True)
+            raise
+
+    def local_path(self, path: str) -> Optional[Path]:
+        file_path = self.base_dir / path
+        return file_path if file_path.is_file() else None
+
+    async def presigned_upload_url(
+        self,
+        path: str,
+        content_type: str,
+        expires_in: int = PRESIGNED_URL_EXPIRES_SECONDS,
+    ) -> str:
+        token = sign_local_token(path, "PUT", expires_in, content_type=content_type)
+        return f"{LOCAL_STORAGE_BASE_URL}/storage/local/{token}"
+
+    async def presigned_download_url(
+        self,
+        path: str,
+        expires_in: int = PRESIGNED_URL_EXPIRES_SECONDS,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> str:
+        token = sign_local_token(
+            path, "GET", expires_in, content_type=content_type, filename=filename
+        )
+        return f"{LOCAL_STORAGE_BASE_URL}/storage/local/{token}"
+
+
+def _local_token_signature(payload: str) -> str:
+    return hmac.new(
+        LOCAL_STORAGE_SIGNING_KEY.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+def sign_local_token(
+    path: str,
+    method: str,
+    expires_in: int,
+    content_type: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> str:
+    """Signed, expiring grant to PUT or GET one LocalStorage path"""
+    claims = {
+        "path": path,
+        "method": method,
+        "expires_at": int(time.time()) + expires_in,
+        "content_type": content_type,
+        "filename": filename,
+    }
+    payload = base64.urlsafe_b64encode(
+        json.dumps(claims, separators=(",", ":")).encode("utf-8")
+    ).decode("ascii").rstrip("=")
+    return f"{payload}.{_local_token_signature(payload)}"
+
+
+def verify_local_token(token: str, method: str) -> dict:
+    """
+    Return the claims of a token issued by sign_local_token.
+    Raises:
+        ValueError: Bad signature, wrong method or expired.
+    """
+    payload, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature, _local_token_signature(payload)):
+        raise ValueError("Invalid storage token")
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    if claims.get("method") != method:
+        raise ValueError("Storage token is not valid for this method")
+    if claims.get("expires_at", 0) < time.time():
+        raise ValueError("Storage token has expired")
+    return claims
+
 
 class StorageFactory:
     """Factory for creating storage"""
@@ -92,10 +603,51 @@ class StorageFactory:
     def create_storage() -> Storage:
         if S3_STORAGE == "True":
             session = aioboto3.Session()
-            return S3Storage(S3_BUCKET, session)
+            return S3Storage(S3_BUCKET, session, endpoint_url=S3_ENDPOINT_URL)
         else:
             return LocalStorage(LOCAL_DOCUMENTS_DIR)
 
 
 # Global storage instance
 storage: Storage = StorageFactory.create_storage()
+
+# Strong references to in-flight background saves, so they aren't collected
+_background_saves: set[asyncio.Task] = set()
+
+
+async def _save_file_logged(
+    file_bytes: bytes, path: str, superseded_prefix: Optional[str]
+) -> None:
+    try:
+        await storage.save_file(file_bytes, path)
+    except Exception as e:
+        logger.error(f"Background save failed for {path}: {e}")
+        return
+    if superseded_prefix is None:
+        return
+    try:
+        for old_path in await storage.list_files(superseded_prefix):
+            if old_path != path:
+                await storage.delete_file(old_path)
+    except Exception as e:
+        logger.error(f"Failed to delete files superseded by {path}: {e}")
+
+
+def save_file_in_background(
+    file_bytes: bytes, path: str, superseded_prefix: Optional[str] = None
+) -> asyncio.Task:
+    """
+    Save file bytes to storage without making the caller wait for it. Once
+    saved, other files starting with superseded_prefix (older versions of
+    the same file) are deleted.
+    """
+    task = asyncio.create_task(_save_file_logged(file_bytes, path, superseded_prefix))
+    _background_saves.add(task)
+    task.add_done_callback(_background_saves.discard)
+    return task
+
+
+async def wait_for_background_saves(timeout: float = 30) -> None:
+    """Give in-flight background saves a chance to finish, e.g. at shutdown"""
+    if _background_saves:
+        await asyncio.wait(set(_background_saves), timeout=timeout)
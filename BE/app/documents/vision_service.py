@@ -1,5 +1,7 @@
+import asyncio
 import httpx
-from fastapi import UploadFile
+from typing import BinaryIO
+from app.http_client import create_async_client, request_timeout
 import json
 import dotenv
 import os
@@ -11,6 +13,8 @@ dotenv.load_dotenv()
 
 VISION_LAMBDA_URL = os.getenv("VISION_LAMBDA_URL")  # TODO: Set the actual URL
 VISION_LAMBDA_API_KEY = os.getenv("VISION_LAMBDA_API_KEY")
+# Max concurrent requests to the Vision Lambda per API worker
+VISION_MAX_CONCURRENCY = int(os.getenv("VISION_MAX_CONCURRENCY", "4"))
 
 DEFAULT_DOCUMENT_KEYS = [
     "us_visa",
@@ -27,18 +31,41 @@ DEFAULT_DOCUMENT_KEYS = [
 class VisionService:
     """Global service instance for Vision Lambda API operations"""
 
-    def __init__(self, url: str | None = None, api_key: str | None = None):
+    def __init__(
+        self,
+        url: str | None = None,
+        api_key: str | None = None,
+        max_concurrency: int = VISION_MAX_CONCURRENCY,
+    ):
         self.url = url
         self.api_key = api_key
         self.enabled = bool(url and api_key)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._client: httpx.AsyncClient | None = None
+
+    def start(self):
+        """Open the pooled HTTP client (also opened lazily on first call)"""
+        if self._client is None or self._client.is_closed:
+            self._client = create_async_client()
+
+    async def close(self):
+        """Close the pooled HTTP client and its connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def send_document(
         self,
-        file: UploadFile,
+        filename: str,
+        content: bytes | BinaryIO,
+        content_type: str | None,
         timeout: float = 30.0,
         document_keys: list = DEFAULT_DOCUMENT_KEYS,
     ) -> dict:
-        """Send document to Vision Lambda API for processing"""
+        """
+        Send document to Vision Lambda API for processing.
+        content is the file bytes or an open binary file (e.g. UploadFile.file).
+        """
         if not self.enabled:
             logger.info("Vision Lambda is disabled, returning default response")
             return {"inferred_type": None, "extracted_data": {}}
@@ -46,12 +73,17 @@ class VisionService:
         try:
             headers = {"X-Api-Key": self.api_key}
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                files = {"file": (file.filename, file.file, file.content_type)}
+            self.start()
+            async with self._slots:
+                files = {"file": (filename, content, content_type)}
                 data = {"document_keys": json.dumps(document_keys)}
 
-                response = await client.post(
-                    self.url, files=files, data=data, headers=headers
+                response = await self._client.post(
+                    self.url,
+                    files=files,
+                    data=data,
+                    headers=headers,
+                    timeout=request_timeout(timeout),
                 )
                 response.raise_for_status()
 
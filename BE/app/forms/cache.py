@@ -3,137 +3,538 @@ Form Template Cache Module
 
 Global application-level cache for template data only.
 Response data is NEVER cached - always fetched fresh from database.
+
+Template data is cached as frozen snapshots that are not bound to any
+session, so cache hits cost no queries and no session merge.
+
+Each form template has a version counter in the database, bumped by triggers
+whenever the template or its sections, fields or options change. Workers
+re-check it periodically and drop their entries for a template whose version
+moved, so template edits reach every worker without a manual cache clear.
 """
 
 from sqlalchemy.orm import Session as DBSession
-from collections import defaultdict
-from typing import Dict, List, Optional
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import datetime
+import logging
+import os
+import sys
 import threading
+import time
+import uuid
 
 from app.models import (
+    FormTemplate,
+    FormTemplateStatus,
     FormTemplateField,
     FormTemplateFieldOption,
     FormTemplateSection,
     Form,
-    FormFieldResponse,
     FormTemplateFieldTypes,
+    FormTemplateFieldSubTypes,
+)
+from app.forms.responses import load_response_snapshot
+from app.forms.pdf.dependency import (
+    CompiledDependency,
+    DependencyGraph,
+    compile_dependency,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+# How often (seconds) a worker re-reads a template's version before serving it
+# from cache. 0 checks on every access.
+VERSION_CHECK_INTERVAL_SECONDS = float(
+    os.getenv("FORMS_CACHE_VERSION_CHECK_SECONDS", "5")
+)
+# Per-cache bounds. TTL and byte limits of 0 disable them.
+MAX_ENTRIES = int(os.getenv("FORMS_CACHE_MAX_ENTRIES", "10000"))
+MAX_BYTES = int(os.getenv("FORMS_CACHE_MAX_BYTES", "0"))
+TTL_SECONDS = float(os.getenv("FORMS_CACHE_TTL_SECONDS", "0"))
+
+
+@dataclass(frozen=True, slots=True)
+class SectionSnapshot:
+    """Session-free copy of a FormTemplateSection"""
+
+    id: int
+    public_id: uuid.UUID
+    form_template_id: int
+    name: str
+    sequence: int
+    description: Optional[str]
+    page_number: Optional[int]
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    @classmethod
+    def from_model(cls, section: FormTemplateSection) -> "SectionSnapshot":
+        return cls(
+            id=section.id,
+            public_id=section.public_id,
+            form_template_id=section.form_template_id,
+            name=section.name,
+            sequence=section.sequence,
+            description=section.description,
+            page_number=section.page_number,
+            created_at=section.created_at,
+            updated_at=section.updated_at,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FieldSnapshot:
+    """Session-free copy of a FormTemplateField"""
+
+    id: int
+    section_id: int
+    key: str
+    name: str
+    type: FormTemplateFieldTypes
+    sub_type: Optional[FormTemplateFieldSubTypes]
+    sequence: int
+    optional: bool
+    css_class: Optional[str]
+    pdf_field_name: Optional[str]
+    dependency_expression: Optional[str]
+    should_fill_on_form: bool
+
+    @classmethod
+    def from_model(cls, field: FormTemplateField) -> "FieldSnapshot":
+        return cls(
+            id=field.id,
+            section_id=field.section_id,
+            key=field.key,
+            name=field.name,
+            type=field.type,
+            sub_type=field.sub_type,
+            sequence=field.sequence,
+            optional=field.optional,
+            css_class=field.css_class,
+            pdf_field_name=field.pdf_field_name,
+            dependency_expression=field.dependency_expression,
+            should_fill_on_form=field.should_fill_on_form,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class OptionSnapshot:
+    """Session-free copy of a FormTemplateFieldOption"""
+
+    id: int
+    field_id: int
+    key: str
+    name: Optional[str]
+    pdf_field_name: Optional[str]
+
+    @classmethod
+    def from_model(cls, option: FormTemplateFieldOption) -> "OptionSnapshot":
+        return cls(
+            id=option.id,
+            field_id=option.field_id,
+            key=option.key,
+            name=option.name,
+            pdf_field_name=option.pdf_field_name,
+        )
+
+
+class LRUCache:
+    """
+    Size-bounded mapping with LRU eviction, optional TTL and hit/miss counters.
+    Not locked itself - callers hold _cache_lock.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float = 0,
+        max_bytes: int = 0,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # key -> (value, approx_bytes, stored_at)
+        self._entries: "OrderedDict[Any, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if self.ttl_seconds and time.monotonic() - entry[2] > self.ttl_seconds:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def __setitem__(self, key, value) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = estimate_size(value)
+        self._entries[key] = (value, size, time.monotonic())
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._remove(key)
+        return entry[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "approx_bytes": self._bytes,
+        }
+
+
+def estimate_size(value, _seen: Optional[set] = None) -> int:
+    """Approximate deep size in bytes of a cached value (snapshots, containers, scalars)."""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen or isinstance(value, Enum):
+        # Shared objects and enum members are counted once / not at all
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(value, (Mapping, MappingProxyType)):
+        return size + sum(
+            estimate_size(key, _seen) + estimate_size(item, _seen)
+            for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, _seen) for item in value)
+    slots = getattr(type(value), "__slots__", ())
+    if isinstance(slots, str):
+        slots = (slots,)
+    for slot in slots:
+        size += estimate_size(getattr(value, slot, None), _seen)
+    if hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), _seen)
+    return size
+
+
+# Global cache - bounded, and entries are dropped when their form template's version changes
+_template_fields_cache = LRUCache("template_fields", MAX_ENTRIES, TTL_SECONDS, MAX_BYTES)
+_field_options_cache = LRUCache("field_options", MAX_ENTRIES, TTL_SECONDS, MAX_BYTES)
+_sections_cache = LRUCache("sections", MAX_ENTRIES, TTL_SECONDS, MAX_BYTES)
+_form_template_sections_cache = LRUCache(
+    "form_template_sections", MAX_ENTRIES, TTL_SECONDS, MAX_BYTES
+)
+_compiled_dependency_cache = LRUCache(
+    "compiled_dependencies", MAX_ENTRIES, TTL_SECONDS, MAX_BYTES
+)
+_dependency_graph_cache = LRUCache("dependency_graphs", MAX_ENTRIES, TTL_SECONDS, MAX_BYTES)
+
+_caches = (
+    _template_fields_cache,
+    _field_options_cache,
+    _sections_cache,
+    _form_template_sections_cache,
+    _compiled_dependency_cache,
+    _dependency_graph_cache,
 )
 
-# Global cache - persists until backend restart
-_template_fields_cache: Dict[int, Dict[int, FormTemplateField]] = {}
-_field_options_cache: Dict[int, List[FormTemplateFieldOption]] = {}
-_sections_cache: Dict[int, FormTemplateSection] = {}
-_form_template_sections_cache: Dict[int, List[int]] = {}
+# Ownership and version bookkeeping for invalidation
+_section_template_ids: Dict[int, int] = {}
+_field_template_ids: Dict[int, int] = {}
+_template_versions: Dict[int, int] = {}
+_template_version_checked_at: Dict[int, float] = {}
 
 # Thread safety
 _cache_lock = threading.RLock()
 
 
+def _invalidate_template_locked(form_template_id: int) -> None:
+    """Drop every cached entry that belongs to a form template. Caller holds _cache_lock."""
+    section_ids = [
+        section_id
+        for section_id, template_id in _section_template_ids.items()
+        if template_id == form_template_id
+    ]
+    field_ids = [
+        field_id
+        for field_id, template_id in _field_template_ids.items()
+        if template_id == form_template_id
+    ]
+
+    for section_id in section_ids:
+        _template_fields_cache.pop(section_id, None)
+        _sections_cache.pop(section_id, None)
+        _section_template_ids.pop(section_id, None)
+    for field_id in field_ids:
+        _field_options_cache.pop(field_id, None)
+        _compiled_dependency_cache.pop(field_id, None)
+        _field_template_ids.pop(field_id, None)
+    _form_template_sections_cache.pop(form_template_id, None)
+    _dependency_graph_cache.pop(form_template_id, None)
+
+
+def _sync_version_locked(form_template_id: int, version: int) -> None:
+    """Record the template version seen in the database, invalidating on change. Caller holds _cache_lock."""
+    known_version = _template_versions.get(form_template_id)
+    if known_version != version:
+        if known_version is not None:
+            logger.info(
+                f"Form template {form_template_id} changed "
+                f"(version {known_version} -> {version}), invalidating cache"
+            )
+        _invalidate_template_locked(form_template_id)
+        _template_versions[form_template_id] = version
+    _template_version_checked_at[form_template_id] = time.monotonic()
+
+
+def _ensure_current(db: DBSession, form_template_id: int) -> None:
+    """
+    Check the template version (at most once per VERSION_CHECK_INTERVAL_SECONDS)
+    and drop this worker's cached entries for it if another process changed it.
+    """
+    with _cache_lock:
+        checked_at = _template_version_checked_at.get(form_template_id)
+        if (
+            checked_at is not None
+            and time.monotonic() - checked_at < VERSION_CHECK_INTERVAL_SECONDS
+        ):
+            return
+
+    version = (
+        db.query(FormTemplate.version)
+        .filter(FormTemplate.id == form_template_id)
+        .scalar()
+    )
+
+    with _cache_lock:
+        _sync_version_locked(form_template_id, version or 0)
+
+
 def get_template_fields_for_section(
     db: DBSession, section_id: int
-) -> Dict[int, FormTemplateField]:
+) -> Mapping[int, FieldSnapshot]:
     """Get all template fields for a section with global caching."""
     with _cache_lock:
-        if section_id in _template_fields_cache:
-            # Merge cached objects into current session to avoid detached instance errors
-            cached_fields = _template_fields_cache[section_id]
-            merged_fields = {}
-            for field_id, field in cached_fields.items():
-                merged_fields[field_id] = db.merge(field)
-            return merged_fields
+        form_template_id = _section_template_ids.get(section_id)
+    if form_template_id is not None:
+        _ensure_current(db, form_template_id)
 
-    fields = (
-        db.query(FormTemplateField)
-        .filter(FormTemplateField.section_id == section_id)
+    with _cache_lock:
+        cached_fields = _template_fields_cache.get(section_id)
+    if cached_fields is not None:
+        return cached_fields
+
+    # Outer join so an empty section still tells us its template and version
+    rows = (
+        db.query(FormTemplateSection.form_template_id, FormTemplate.version, FormTemplateField)
+        .select_from(FormTemplateSection)
+        .join(FormTemplate, FormTemplateSection.form_template_id == FormTemplate.id)
+        .outerjoin(FormTemplateField, FormTemplateField.section_id == FormTemplateSection.id)
+        .filter(FormTemplateSection.id == section_id)
         .all()
     )
+    if not rows:
+        return MappingProxyType({})
 
-    fields_dict = {field.id: field for field in fields}
+    form_template_id, version = rows[0][0], rows[0][1]
+    # Read-only view so callers cannot mutate the shared cache entry
+    fields_dict = MappingProxyType(
+        {field.id: FieldSnapshot.from_model(field) for _, _, field in rows if field}
+    )
 
     with _cache_lock:
+        _sync_version_locked(form_template_id, version)
         _template_fields_cache[section_id] = fields_dict
+        _section_template_ids[section_id] = form_template_id
+        for field_id in fields_dict:
+            _field_template_ids[field_id] = form_template_id
 
     return fields_dict
 
 
 def get_field_options(
     db: DBSession, field_ids: List[int]
-) -> Dict[int, List[FormTemplateFieldOption]]:
+) -> Dict[int, Tuple[OptionSnapshot, ...]]:
     """Get field options for multiple fields with global caching."""
     results = {}
     uncached_field_ids = []
 
+    with _cache_lock:
+        template_ids = {
+            _field_template_ids[field_id]
+            for field_id in field_ids
+            if field_id in _field_template_ids
+        }
+    for form_template_id in template_ids:
+        _ensure_current(db, form_template_id)
+
     with _cache_lock:
         for field_id in field_ids:
-            if field_id in _field_options_cache:
-                # Merge cached objects into current session to avoid detached instance errors
-                cached_options = _field_options_cache[field_id]
-                merged_options = [db.merge(option) for option in cached_options]
-                results[field_id] = merged_options
+            cached_options = _field_options_cache.get(field_id)
+            if cached_options is not None:
+                results[field_id] = cached_options
             else:
                 uncached_field_ids.append(field_id)
 
     if uncached_field_ids:
-        options = (
-            db.query(FormTemplateFieldOption)
-            .filter(FormTemplateFieldOption.field_id.in_(uncached_field_ids))
+        # Outer join so fields without options are cached (and invalidated) too
+        rows = (
+            db.query(
+                FormTemplateField.id,
+                FormTemplateSection.form_template_id,
+                FormTemplate.version,
+                FormTemplateFieldOption,
+            )
+            .select_from(FormTemplateField)
+            .join(FormTemplateSection, FormTemplateField.section_id == FormTemplateSection.id)
+            .join(FormTemplate, FormTemplateSection.form_template_id == FormTemplate.id)
+            .outerjoin(FormTemplateFieldOption, FormTemplateFieldOption.field_id == FormTemplateField.id)
+            .filter(FormTemplateField.id.in_(uncached_field_ids))
             .all()
         )
 
         options_by_field = defaultdict(list)
-        for option in options:
-            options_by_field[option.field_id].append(option)
+        field_templates = {}
+        template_versions = {}
+        for field_id, form_template_id, version, option in rows:
+            field_templates[field_id] = form_template_id
+            template_versions[form_template_id] = version
+            if option:
+                options_by_field[field_id].append(OptionSnapshot.from_model(option))
 
         with _cache_lock:
+            for form_template_id, version in template_versions.items():
+                _sync_version_locked(form_template_id, version)
             for field_id in uncached_field_ids:
-                field_options = options_by_field[field_id]
-                _field_options_cache[field_id] = field_options
+                field_options = tuple(options_by_field[field_id])
                 results[field_id] = field_options
+                if field_id in field_templates:
+                    _field_options_cache[field_id] = field_options
+                    _field_template_ids[field_id] = field_templates[field_id]
 
     return results
 
 
-def get_section(db: DBSession, section_id: int) -> Optional[FormTemplateSection]:
+def get_section(db: DBSession, section_id: int) -> Optional[SectionSnapshot]:
     """Get section with global caching."""
     with _cache_lock:
-        if section_id in _sections_cache:
-            # Merge cached object into current session to avoid detached instance errors
-            return db.merge(_sections_cache[section_id])
+        form_template_id = _section_template_ids.get(section_id)
+    if form_template_id is not None:
+        _ensure_current(db, form_template_id)
 
-    section = (
-        db.query(FormTemplateSection)
+    with _cache_lock:
+        cached = _sections_cache.get(section_id)
+    if cached is not None:
+        return cached
+
+    row = (
+        db.query(FormTemplateSection, FormTemplate.version)
+        .join(FormTemplate, FormTemplateSection.form_template_id == FormTemplate.id)
         .filter(FormTemplateSection.id == section_id)
         .first()
     )
 
-    if section:
-        with _cache_lock:
-            _sections_cache[section_id] = section
+    if not row:
+        return None
 
-    return section
+    section, version = row
+    snapshot = SectionSnapshot.from_model(section)
+    with _cache_lock:
+        _sync_version_locked(snapshot.form_template_id, version)
+        _sections_cache[section_id] = snapshot
+        _section_template_ids[section_id] = snapshot.form_template_id
+
+    return snapshot
+
+
+def get_compiled_dependency(field_id: int, expression: str) -> CompiledDependency:
+    """Get the compiled dependency expression for a template field with global caching."""
+    with _cache_lock:
+        compiled = _compiled_dependency_cache.get(field_id)
+        if compiled is not None and compiled.expression == expression:
+            return compiled
+
+    compiled = compile_dependency(expression)
+
+    with _cache_lock:
+        _compiled_dependency_cache[field_id] = compiled
+
+    return compiled
 
 
 def get_template_fields_for_form(
     db: DBSession, form_id: int
-) -> Dict[int, FormTemplateField]:
+) -> Dict[int, FieldSnapshot]:
     """Get all template fields for an entire form with global caching."""
     form = db.query(Form).filter(Form.id == form_id).first()
     if not form:
         return {}
 
-    form_template_id = form.form_template_id
+    return get_template_fields_for_template(db, form.form_template_id)
+
+
+def get_template_fields_for_template(
+    db: DBSession, form_template_id: int
+) -> Dict[int, FieldSnapshot]:
+    """Get all template fields for a form template with global caching."""
+    _ensure_current(db, form_template_id)
 
     with _cache_lock:
-        if form_template_id in _form_template_sections_cache:
-            section_ids = _form_template_sections_cache[form_template_id]
-        else:
-            sections = (
-                db.query(FormTemplateSection)
-                .filter(FormTemplateSection.form_template_id == form_template_id)
-                .all()
-            )
-            section_ids = [section.id for section in sections]
+        section_ids = _form_template_sections_cache.get(form_template_id)
+
+    if section_ids is None:
+        rows = (
+            db.query(FormTemplate.version, FormTemplateSection.id)
+            .select_from(FormTemplate)
+            .outerjoin(FormTemplateSection, FormTemplateSection.form_template_id == FormTemplate.id)
+            .filter(FormTemplate.id == form_template_id)
+            .all()
+        )
+        section_ids = [section_id for _, section_id in rows if section_id is not None]
+        with _cache_lock:
+            if rows:
+                _sync_version_locked(form_template_id, rows[0][0])
             _form_template_sections_cache[form_template_id] = section_ids
+            for section_id in section_ids:
+                _section_template_ids[section_id] = form_template_id
 
     all_fields = {}
     for section_id in section_ids:
@@ -143,8 +544,124 @@ def get_template_fields_for_form(
     return all_fields
 
 
+def get_dependency_graph(db: DBSession, form_template_id: int) -> DependencyGraph:
+    """Get the field dependency graph of a form template with global caching."""
+    _ensure_current(db, form_template_id)
+
+    with _cache_lock:
+        graph = _dependency_graph_cache.get(form_template_id)
+    if graph is not None:
+        return graph
+
+    template_fields = get_template_fields_for_template(db, form_template_id)
+    expressions = {
+        field.key: get_compiled_dependency(field_id, field.dependency_expression)
+        for field_id, field in template_fields.items()
+        if field.dependency_expression
+    }
+    graph = DependencyGraph(form_template_id, expressions)
+
+    with _cache_lock:
+        _dependency_graph_cache[form_template_id] = graph
+
+    return graph
+
+
+def warm_up(db: DBSession) -> dict:
+    """
+    Bulk-load every ACTIVE form template (sections, fields, options) into the
+    cache with one query per entity type, then build the dependency graphs.
+    """
+    templates = (
+        db.query(FormTemplate.id, FormTemplate.version)
+        .filter(FormTemplate.status == FormTemplateStatus.ACTIVE)
+        .all()
+    )
+    template_ids = [template_id for template_id, _ in templates]
+    if not template_ids:
+        return {"templates": 0, "sections": 0, "fields": 0, "options": 0}
+
+    sections = (
+        db.query(FormTemplateSection)
+        .filter(FormTemplateSection.form_template_id.in_(template_ids))
+        .all()
+    )
+    fields = (
+        db.query(FormTemplateField)
+        .join(FormTemplateSection, FormTemplateField.section_id == FormTemplateSection.id)
+        .filter(FormTemplateSection.form_template_id.in_(template_ids))
+        .all()
+    )
+    options = (
+        db.query(FormTemplateFieldOption)
+        .join(FormTemplateField, FormTemplateFieldOption.field_id == FormTemplateField.id)
+        .join(FormTemplateSection, FormTemplateField.section_id == FormTemplateSection.id)
+        .filter(FormTemplateSection.form_template_id.in_(template_ids))
+        .all()
+    )
+
+    section_snapshots = [SectionSnapshot.from_model(section) for section in sections]
+    fields_by_section = defaultdict(dict)
+    for field in fields:
+        fields_by_section[field.section_id][field.id] = FieldSnapshot.from_model(field)
+    options_by_field = defaultdict(list)
+    for option in options:
+        options_by_field[option.field_id].append(OptionSnapshot.from_model(option))
+
+    with _cache_lock:
+        for form_template_id, version in templates:
+            _sync_version_locked(form_template_id, version)
+            _form_template_sections_cache[form_template_id] = [
+                section.id
+                for section in section_snapshots
+                if section.form_template_id == form_template_id
+            ]
+        for section in section_snapshots:
+            form_template_id = section.form_template_id
+            section_fields = fields_by_section.get(section.id, {})
+            _sections_cache[section.id] = section
+            _section_template_ids[section.id] = form_template_id
+            _template_fields_cache[section.id] = MappingProxyType(section_fields)
+            for field_id in section_fields:
+                _field_template_ids[field_id] = form_template_id
+                _field_options_cache[field_id] = tuple(options_by_field[field_id])
+
+    for form_template_id in template_ids:
+        get_dependency_graph(db, form_template_id)
+
+    return {
+        "templates": len(template_ids),
+        "sections": len(section_snapshots),
+        "fields": len(fields),
+        "options": len(options),
+    }
+
+
+def clear() -> None:
+    """Drop all cached template data in this process."""
+    with _cache_lock:
+        for lru_cache in _caches:
+            lru_cache.clear()
+        _section_template_ids.clear()
+        _field_template_ids.clear()
+        _template_versions.clear()
+        _template_version_checked_at.clear()
+
+
+def stats() -> dict:
+    """Hits, misses, evictions and approximate memory of every template cache."""
+    with _cache_lock:
+        caches = {lru_cache.name: lru_cache.stats() for lru_cache in _caches}
+        template_versions = dict(_template_versions)
+    return {
+        "caches": caches,
+        "approx_bytes": sum(cache_stats["approx_bytes"] for cache_stats in caches.values()),
+        "template_versions": template_versions,
+    }
+
+
 def get_pdf_field_mappings(db: DBSession, form_id: int) -> dict:
-    """Generate PDF field mappings using cached template data and ad hoc response queries."""
+    """Generate PDF field mappings using cached template data and one response query."""
     # Get cached template fields for the form
     template_fields = get_template_fields_for_form(db, form_id)
 
@@ -161,29 +678,24 @@ def get_pdf_field_mappings(db: DBSession, form_id: int) -> dict:
         get_field_options(db, select_field_ids) if select_field_ids else {}
     )
 
-    # Build PDF field mappings by querying responses ad hoc for each field
+    # All responses of the form in a single query
+    responses = load_response_snapshot(db, form_id)
+
     mappings = {}
 
     for field_id, template_field in template_fields.items():
         if not template_field.should_fill_on_form:
             continue
 
-        # Query response ad hoc for this specific field
-        response = (
-            db.query(FormFieldResponse)
-            .filter(
-                FormFieldResponse.form_id == form_id,
-                FormFieldResponse.form_template_field_id == field_id,
-            )
-            .first()
-        )
-
+        response = responses.get(field_id)
         if not response:
             continue
 
         if template_field.type == FormTemplateFieldTypes.SELECT_ONE:
-            field_options = options_by_field.get(template_field.id, [])
+            field_options = options_by_field.get(template_field.id, ())
             for option in field_options:
+                if not option.pdf_field_name:
+                    continue
                 if str(option.id) == str(response.value):
                     mappings[option.pdf_field_name] = "/Y"
                 else:
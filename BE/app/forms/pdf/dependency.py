@@ -5,54 +5,50 @@ from app.models import (
     FormTemplate,
     FormTemplateFieldTypes,
 )
-from app.database import SessionLocal
+from app.forms.responses import ResponseSnapshot
 from sqlalchemy.orm import Session as DBSession
+from typing import Optional
+from collections import defaultdict
+import ast
+import logging
+import operator
 import re
 
+logger = logging.getLogger("uvicorn.error")
 
-def check_dependency(expression: str, db: Session, form_id: int):
-    """_summary_
+
+def check_dependency(
+    expression: str,
+    db: Session,
+    form_id: int,
+    responses: Optional[ResponseSnapshot] = None,
+):
+    """Evaluate a dependency expression against the form's responses.
 
     Args:
-        expression (str): _description_
-        form_id (int): _description_
-        db (Session): _description_
+        expression (str): Dependency expression, e.g. "{Some.Key} == 'Yes'"
+        db (Session): Database session
+        form_id (int): Form ID
+        responses (ResponseSnapshot): Preloaded responses for the form. When
+            given, field references are resolved from the snapshot instead of
+            one query per reference.
     """
     # if no dependency expression
     if not expression:
         return True
 
-    # parse expression
-    field_pattern = r"\{([^}]+)\}"
-    field_references = re.findall(field_pattern, expression)
+    compiled = compile_dependency(expression)
 
     # find value
     field_values = {}
-    for field_ref in field_references:
-        value = get_field_value(field_ref, db, form_id)
-        converted_value = convert_string_to_proper_type(value)
-        field_values[field_ref] = converted_value
-
-    # trun result into real value
-    processed_expression = expression
-    for field_ref, value in field_values.items():
-        if isinstance(value, str):
-            escaped_value = f"'{value}'"
-        elif value is None:
-            escaped_value = "None"
-        elif isinstance(value, (int, float)):
-            escaped_value = str(value)
-        elif isinstance(value, bool):
-            escaped_value = str(value)
+    for field_ref in compiled.field_refs:
+        if responses is not None:
+            value = responses.value_for_key(field_ref)
         else:
-            escaped_value = f"'{str(value)}'"
+            value = get_field_value(field_ref, db, form_id)
+        field_values[field_ref] = convert_string_to_proper_type(value)
 
-        # we got "user result pairing target result time"
-        processed_expression = processed_expression.replace(
-            f"{{{field_ref}}}", escaped_value
-        )
-        # print(processed_expression)
-    return evaluate_dependency_safe(processed_expression)
+    return compiled.evaluate(field_values)
 
 
 def get_field_value(field_key, db: Session, form_id):
@@ -73,52 +69,146 @@ def get_field_value(field_key, db: Session, form_id):
         return None
 
 
-def evaluate_dependency_safe(expression: str):
-    # set limited functions to avoid maticulous inputs
-    allowed_names = {
-        "__builtins__": {},
-        "True": True,
-        "False": False,
-        "None": None,
-        "true": True,
-        "false": False,
-        "null": None,
-        "Yes": True,
-        "No": False,
-    }
+FIELD_REFERENCE_PATTERN = re.compile(r"\{([^}]+)\}")
+
+# Bare names allowed in expressions and the constants they stand for
+_NAME_CONSTANTS = {
+    "True": True,
+    "False": False,
+    "None": None,
+    "true": True,
+    "false": False,
+    "null": None,
+    "Yes": True,
+    "No": False,
+}
+
+_COMPARE_OPERATORS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda left, right: left in right,
+    ast.NotIn: lambda left, right: left not in right,
+}
+
+_REFERENCE_PREFIX = "__ref_"
+
+
+class CompiledDependency:
+    """A dependency expression parsed and validated once, evaluated many times.
+
+    `evaluate` takes a {field_key: typed_value} dict (see
+    `convert_string_to_proper_type`) and never calls eval.
+    """
+
+    __slots__ = ("expression", "field_refs", "error", "_evaluate")
+
+    def __init__(self, expression: str, field_refs: tuple, evaluate, error=None):
+        self.expression = expression
+        self.field_refs = field_refs
+        self.error = error
+        self._evaluate = evaluate
+
+    def evaluate(self, values: dict) -> bool:
+        try:
+            return bool(self._evaluate(values))
+        except Exception as e:
+            # e.g. comparing None with a number when a field is unanswered
+            logger.debug(f"Dependency '{self.expression}' evaluated to False: {e}")
+            return False
+
+
+def compile_dependency(expression: str) -> CompiledDependency:
+    """
+    Parse a dependency expression into a closure tree.
+    Supports {field} references, literals, ==, !=, <, <=, >, >=, in, not in,
+    &&/||/and/or/not and parentheses. Invalid expressions compile to an
+    expression that always evaluates to False.
+    """
+    field_refs = []
+
+    def replace_reference(match):
+        field_ref = match.group(1)
+        if field_ref not in field_refs:
+            field_refs.append(field_ref)
+        return f"{_REFERENCE_PREFIX}{field_refs.index(field_ref)}"
 
     try:
-        safe_expression = expression
+        source = FIELD_REFERENCE_PATTERN.sub(replace_reference, expression)
         # for yes/no
-        safe_expression = safe_expression.replace("'Yes'", "True")
-        safe_expression = safe_expression.replace("'No'", "False")
-
+        source = source.replace("'Yes'", "True").replace("'No'", "False")
         # logic
-        safe_expression = safe_expression.replace("||", " or ")
-        safe_expression = safe_expression.replace("&&", " and ")
-
-        # replace
-        safe_expression = safe_expression.replace(">=", "___GTE___")
-        safe_expression = safe_expression.replace("<=", "___LTE___")
-        safe_expression = safe_expression.replace("!=", "___NE___")
-        safe_expression = safe_expression.replace("==", "___EQ___")
-
-        # signle operator
-        safe_expression = safe_expression.replace(">", " > ")
-        safe_expression = safe_expression.replace("<", " < ")
-
-        # replace back
-        safe_expression = safe_expression.replace("___GTE___", " >= ")
-        safe_expression = safe_expression.replace("___LTE___", " <= ")
-        safe_expression = safe_expression.replace("___NE___", " != ")
-        safe_expression = safe_expression.replace("___EQ___", " == ")
-
-        # evaluate
-        result = eval(safe_expression, {"__builtins__": {}}, allowed_names)
-        return bool(result)
-    except Exception as e:
-        print(f"Error evaluating safe expression: {e}")
-        return False
+        source = source.replace("||", " or ").replace("&&", " and ")
+
+        tree = ast.parse(source.strip(), mode="eval")
+        evaluate = _compile_node(tree.body, tuple(field_refs))
+        return CompiledDependency(expression, tuple(field_refs), evaluate)
+    except (SyntaxError, ValueError) as e:
+        logger.error(f"Invalid dependency expression '{expression}': {e}")
+        return CompiledDependency(
+            expression, tuple(field_refs), lambda values: False, error=str(e)
+        )
+
+
+def _compile_node(node: ast.AST, field_refs: tuple):
+    """Turn a validated AST node into a closure of (values) -> result."""
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (str, int, float, bool, type(None))):
+            raise ValueError(f"Unsupported literal: {node.value!r}")
+        value = node.value
+        return lambda values: value
+
+    if isinstance(node, ast.Name):
+        if node.id.startswith(_REFERENCE_PREFIX):
+            field_ref = field_refs[int(node.id[len(_REFERENCE_PREFIX):])]
+            return lambda values: values.get(field_ref)
+        if node.id in _NAME_CONSTANTS:
+            value = _NAME_CONSTANTS[node.id]
+            return lambda values: value
+        raise ValueError(f"Unknown name: {node.id}")
+
+    if isinstance(node, (ast.Tuple, ast.List)):
+        items = [_compile_node(item, field_refs) for item in node.elts]
+        return lambda values: tuple(item(values) for item in items)
+
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_node(operand, field_refs) for operand in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda values: all(operand(values) for operand in operands)
+        return lambda values: any(operand(values) for operand in operands)
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand, field_refs)
+        if isinstance(node.op, ast.Not):
+            return lambda values: not operand(values)
+        if isinstance(node.op, ast.USub):
+            return lambda values: -operand(values)
+        raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+
+    if isinstance(node, ast.Compare):
+        left = _compile_node(node.left, field_refs)
+        comparisons = []
+        for op, comparator in zip(node.ops, node.comparators):
+            compare = _COMPARE_OPERATORS.get(type(op))
+            if compare is None:
+                raise ValueError(f"Unsupported comparison: {type(op).__name__}")
+            comparisons.append((compare, _compile_node(comparator, field_refs)))
+
+        def evaluate_compare(values):
+            current = left(values)
+            for compare, comparator in comparisons:
+                right = comparator(values)
+                if not compare(current, right):
+                    return False
+                current = right
+            return True
+
+        return evaluate_compare
+
+    raise ValueError(f"Unsupported syntax: {type(node).__name__}")
 
 
 def convert_string_to_proper_type(value):
@@ -155,23 +245,62 @@ def convert_string_to_proper_type(value):
     return value_str
 
 
-def get_dependency_target(section_id: int, db: DBSession):
-    fields = (
-        db.query(FormTemplateField)
-        .filter(FormTemplateField.section_id == section_id)
-        .filter(FormTemplateField.dependency_expression.isnot(None))
-        .all()
-    )
-    print(fields)
-    target = set()
-    for field in fields:
-        field_pattern = r"\{([^}]+)\}"
-        field_references = re.findall(field_pattern, field.dependency_expression)
-        target.update(field_references)
-    return target
+def get_typed_values(responses: ResponseSnapshot) -> dict:
+    """Build the {field_key: typed_value} dict used by CompiledDependency.evaluate"""
+    return {
+        field_key: convert_string_to_proper_type(response.value)
+        for field_key, response in responses.by_field_key.items()
+    }
+
+
+class DependencyGraph:
+    """
+    Field-key dependency graph of one form template, built once from its fields.
+
+    sources:    field key -> keys referenced by that field's dependency expression
+    dependents: field key -> keys of fields whose expression references it
+    """
+
+    __slots__ = ("form_template_id", "sources", "dependents", "expressions")
+
+    def __init__(self, form_template_id: int, expressions: dict):
+        self.form_template_id = form_template_id
+        # {field_key: CompiledDependency} for fields that have an expression
+        self.expressions = expressions
+        self.sources = {
+            key: frozenset(compiled.field_refs) for key, compiled in expressions.items()
+        }
+        dependents = defaultdict(set)
+        for key, refs in self.sources.items():
+            for ref in refs:
+                dependents[ref].add(key)
+        self.dependents = {ref: frozenset(keys) for ref, keys in dependents.items()}
+
+    def targets_for(self, field_keys) -> set:
+        """Keys referenced by the expressions of the given fields"""
+        targets = set()
+        for key in field_keys:
+            targets.update(self.sources.get(key, ()))
+        return targets
+
+    def dependents_of(self, changed_keys) -> set:
+        """Keys of the fields that must be re-checked when these fields change"""
+        affected = set()
+        for key in changed_keys:
+            affected.update(self.dependents.get(key, ()))
+        return affected
+
+    def reevaluate(self, changed_keys, values: dict) -> dict:
+        """Re-check only the dependents of the changed fields: {field_key: should_show}"""
+        return {
+            key: self.expressions[key].evaluate(values)
+            for key in self.dependents_of(changed_keys)
+        }
 
 
 if __name__ == "__main__":
+    from app.database import SessionLocal
+
     db = SessionLocal()
     templates = db.query(FormTemplateField).all()
     for template in templates:
@@ -0,0 +1,118 @@
+"""
+Bounded executor for CPU-bound PDF rendering.
+
+pypdf/pikepdf fills are synchronous and take hundreds of milliseconds, so they
+run in a process pool (or a thread pool with PDF_RENDER_EXECUTOR=thread) off
+the event loop. At most PDF_RENDER_MAX_PENDING renders may be running or
+queued per API worker; beyond that, and when a render exceeds
+PDF_RENDER_TIMEOUT_SECONDS, run() raises TimeoutError. If a render process
+dies (OOM kill, crash in pikepdf) the pool is replaced on the next render
+and run() raises RenderPoolBrokenError, which is worth retrying.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+import asyncio
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger("uvicorn.error")
+
+PDF_RENDER_EXECUTOR = os.getenv("PDF_RENDER_EXECUTOR", "process")
+PDF_RENDER_WORKERS = int(
+    os.getenv("PDF_RENDER_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+PDF_RENDER_MAX_PENDING = int(
+    os.getenv("PDF_RENDER_MAX_PENDING", str(PDF_RENDER_WORKERS * 4))
+)
+PDF_RENDER_TIMEOUT_SECONDS = float(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", "60"))
+
+_executor: Optional[Executor] = None
+_pending = 0
+
+
+class RenderPoolBrokenError(RuntimeError):
+    """A render process died; the pool is rebuilt and the render can be retried"""
+
+
+def start() -> Executor:
+    """Create the render pool if it is not running yet"""
+    global _executor
+    if _executor is None:
+        if PDF_RENDER_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(
+                max_workers=PDF_RENDER_WORKERS, thread_name_prefix="pdf-render"
+            )
+        else:
+            # spawn: forking a process that already runs the event loop and
+            # its helper threads is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        logger.info(
+            f"PDF render executor started ({PDF_RENDER_EXECUTOR}, "
+            f"{PDF_RENDER_WORKERS} workers, {PDF_RENDER_MAX_PENDING} max pending)"
+        )
+    return _executor
+
+
+def shutdown() -> None:
+    """Stop the render pool, dropping renders that have not started"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _discard_broken(executor: Executor) -> None:
+    """Drop a broken pool so the next start() builds a new one"""
+    global _executor
+    if _executor is executor:
+        _executor = None
+        logger.error("PDF render pool broken (a render process died), replacing it")
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run(fn, *args):
+    """
+    Run fn(*args) in the render pool and return its result.
+    Raises:
+        TimeoutError: The render queue is full or the render took too long.
+        RenderPoolBrokenError: A render process died while rendering.
+    """
+    global _pending
+    if _pending >= PDF_RENDER_MAX_PENDING:
+        raise TimeoutError("PDF render queue is full, try again later")
+
+    loop = asyncio.get_running_loop()
+    executor = start()
+    try:
+        future = loop.run_in_executor(executor, fn, *args)
+    except BrokenProcessPool as e:
+        _discard_broken(executor)
+        raise RenderPoolBrokenError("PDF render pool restarting, try again") from e
+
+    # The slot is held until the render really finishes, even after a timeout
+    _pending += 1
+
+    def release(_):
+        global _pending
+        _pending -= 1
+
+    future.add_done_callback(release)
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(future), timeout=PDF_RENDER_TIMEOUT_SECONDS
+        )
+    except TimeoutError:
+        raise TimeoutError(
+            f"PDF render did not finish within {PDF_RENDER_TIMEOUT_SECONDS:g} seconds"
+        )
+    except BrokenProcessPool as e:
+        _discard_broken(executor)
+        raise RenderPoolBrokenError("PDF render process died, try again") from e
+
@@ -0,0 +1,87 @@
+"""
+Synchronous PDF renderers run inside the PDF render executor.
+
+Everything here is module-level and takes/returns plain picklable values so it
+can run in a worker process; keep imports light, spawned workers import this
+module on startup.
+"""
+
+from app.forms.pdf import template_cache
+import io
+import os
+
+# Bump when renderer output changes so cached PDFs are regenerated
+RENDER_VERSION = 1
+
+
+def render_acroform(input_path: str, pair: dict) -> bytes:
+    """
+    Fill an AcroForm template and return the PDF bytes.
+    Args:
+        input_path (str): Path to the template PDF.
+        pair (dict): {pdf_field_name: value} Mapping of field names to values.
+    """
+    template = template_cache.get_template(input_path)
+    writer = template.clone_writer()
+
+    filled_count = 0
+
+    # One update per page that has answered fields
+    for page_idx, page_values in template.widget_index.page_values(pair).items():
+        try:
+            writer.update_page_form_field_values(
+                writer.pages[page_idx],
+                page_values,
+                auto_regenerate=False,
+            )
+            filled_count += len(page_values)
+        except Exception as e:
+            print(f"Failed to fill fields on page {page_idx + 1}: {e}")
+
+    print(f"Total fields filled: {filled_count}")
+
+    pdf_bytes = io.BytesIO()
+    writer.write(pdf_bytes)
+    return pdf_bytes.getvalue()
+
+
+def render_xfa(input_path: str, pair: dict, xml_file_path: str = None) -> bytes:
+    """
+    Fill an XFA template's datasets and return the PDF bytes.
+    Args:
+        input_path (str): Path to the template PDF.
+        pair (dict): {pdf_field_name: value} Mapping of field names to values.
+        xml_file_path (str): datasets.xml to start from.
+    """
+    import pikepdf
+    from bs4 import BeautifulSoup
+    from app.forms.pdf.xfaTools import XfaObj
+
+    if xml_file_path is None:
+        xml_file_path = os.path.join(
+            os.path.dirname(__file__), "i-129_template", "datasets.xml"
+        )
+    with open(xml_file_path, "r", encoding="utf-8") as f:
+        xml_str = f.read()
+
+    with pikepdf.open(input_path) as pdf:
+        # check if file is xfa
+        acro = pdf.Root.get("/AcroForm")
+        if not acro or not acro.get("/XFA"):
+            raise ValueError(f"{input_path} is not an XFA PDF")
+
+        # use BeautifulSoup to modify XML
+        soup = BeautifulSoup(xml_str, "xml")
+        for pdf_field, value in pair.items():
+            if value is not None:
+                tag = soup.find(pdf_field)
+                if tag:
+                    tag.string = str(value)
+        new_xml = str(soup)
+
+        xfa = XfaObj(pdf)
+        # write back to pdf (from xfa)
+        xfa["datasets"] = new_xml
+        pdf_bytes = io.BytesIO()
+        pdf.save(pdf_bytes)
+    return pdf_bytes.getvalue()
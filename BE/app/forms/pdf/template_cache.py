@@ -0,0 +1,141 @@
+"""
+Process-level cache of parsed PDF templates.
+
+Each template file is read and parsed once per process; every fill gets a
+fresh PdfWriter cloned from the cached reader. Entries are reloaded when the
+file's mtime or size changes.
+"""
+
+from collections import defaultdict
+from pypdf import PdfReader, PdfWriter
+import hashlib
+import io
+import logging
+import os
+import threading
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class WidgetIndex:
+    """
+    Field name -> widget locations of one AcroForm template, built once.
+    exact:   /T name -> [(page_idx, /T name)]
+    aliases: /T name without "[0]" suffixes -> [(page_idx, /T name)]
+    """
+
+    __slots__ = ("exact", "aliases")
+
+    def __init__(self, reader: PdfReader):
+        exact = defaultdict(list)
+        aliases = defaultdict(list)
+        for page_idx, page in enumerate(reader.pages):
+            if "/Annots" not in page:
+                continue
+            for annot in page["/Annots"]:
+                try:
+                    annot_obj = annot.get_object()
+                    field_name = annot_obj.get("/T", None)
+
+                    # Skip non-widget annotations
+                    if annot_obj.get("/Subtype", "Unknown") != "/Widget":
+                        continue
+                    # For now, we don't need to get from parent. Can be added later.
+                    if not field_name:
+                        continue
+
+                    field_name = str(field_name)
+                    exact[field_name].append((page_idx, field_name))
+                    base_name = field_name.replace("[0]", "")
+                    if base_name != field_name:
+                        aliases[base_name].append((page_idx, field_name))
+                except Exception as e:
+                    print(f"Error processing annotation: {e}")
+        self.exact = dict(exact)
+        self.aliases = dict(aliases)
+
+    def page_values(self, pair: dict) -> dict:
+        """
+        Group the values of a {pdf_field_name: value} pair by page.
+        Returns:
+            dict: {page_idx: {widget_field_name: value}}
+        A widget's exact name takes precedence over its "[0]"-stripped alias.
+        """
+        pages = defaultdict(dict)
+        for name, value in pair.items():
+            for page_idx, field_name in self.exact.get(name, ()):
+                pages[page_idx][field_name] = value
+            for page_idx, field_name in self.aliases.get(name, ()):
+                if field_name not in pair:
+                    pages[page_idx][field_name] = value
+        return pages
+
+
+class TemplateEntry:
+    """One parsed template: raw bytes, reader and widget index"""
+
+    __slots__ = ("path", "mtime", "size", "data", "reader", "widget_index", "_lock")
+
+    def __init__(self, path: str, mtime: float, size: int, data: bytes):
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.data = data
+        self.reader = PdfReader(io.BytesIO(data))
+        self.widget_index = WidgetIndex(self.reader)
+        # PdfReader is not thread-safe, clones of one entry are serialized
+        self._lock = threading.Lock()
+
+    def clone_writer(self) -> PdfWriter:
+        """A new writer holding a full copy of the template document"""
+        with self._lock:
+            return PdfWriter(clone_from=self.reader)
+
+
+_templates: dict[str, TemplateEntry] = {}
+_templates_lock = threading.Lock()
+
+
+def get_template(pdf_path) -> TemplateEntry:
+    """Return the cached template for a path, (re)loading it if the file changed"""
+    path = os.path.abspath(pdf_path)
+    stat = os.stat(path)
+
+    with _templates_lock:
+        entry = _templates.get(path)
+        if entry and entry.mtime == stat.st_mtime and entry.size == stat.st_size:
+            return entry
+
+        with open(path, "rb") as f:
+            data = f.read()
+        entry = TemplateEntry(path, stat.st_mtime, stat.st_size, data)
+        _templates[path] = entry
+        logger.info(f"Loaded PDF template {path} ({len(data)} bytes)")
+        return entry
+
+
+# sha256 of template files: path -> (mtime, size, hexdigest)
+_file_digests: dict[str, tuple[float, int, str]] = {}
+
+
+def file_digest(pdf_path) -> str:
+    """sha256 of a template file's content, recomputed only when the file changes"""
+    path = os.path.abspath(pdf_path)
+    stat = os.stat(path)
+
+    with _templates_lock:
+        cached = _file_digests.get(path)
+        if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            return cached[2]
+
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        _file_digests[path] = (stat.st_mtime, stat.st_size, digest)
+        return digest
+
+
+def clear() -> None:
+    """Drop all cached templates"""
+    with _templates_lock:
+        _templates.clear()
+        _file_digests.clear()
@@ -0,0 +1,53 @@
+"""
+Form Response Snapshot Module
+
+Loads every response for a form in a single query so field rendering and
+dependency evaluation can use dictionary lookups instead of issuing one
+query per field or per `{field}` reference.
+Snapshots are request-scoped and are never cached across requests.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session as DBSession
+
+from app.models import FormFieldResponse, FormTemplateField
+
+
+@dataclass
+class ResponseSnapshot:
+    """All responses of one form, keyed by template field id and field key."""
+
+    form_id: int
+    by_field_id: Dict[int, FormFieldResponse] = field(default_factory=dict)
+    by_field_key: Dict[str, FormFieldResponse] = field(default_factory=dict)
+
+    def get(self, field_id: int) -> Optional[FormFieldResponse]:
+        return self.by_field_id.get(field_id)
+
+    def value_for_key(self, field_key: str) -> Optional[str]:
+        response = self.by_field_key.get(field_key)
+        return response.value if response else None
+
+
+def load_response_snapshot(db: DBSession, form_id: int) -> ResponseSnapshot:
+    """Fetch all responses for a form (with their field keys) in one query."""
+    rows = (
+        db.query(FormFieldResponse, FormTemplateField.key)
+        .join(
+            FormTemplateField,
+            FormFieldResponse.form_template_field_id == FormTemplateField.id,
+        )
+        .filter(FormFieldResponse.form_id == form_id)
+        .order_by(FormFieldResponse.id)
+        .all()
+    )
+
+    snapshot = ResponseSnapshot(form_id=form_id)
+    for response, field_key in rows:
+        # Keep the first response per field, matching the previous .first() lookups
+        snapshot.by_field_id.setdefault(response.form_template_field_id, response)
+        snapshot.by_field_key.setdefault(field_key, response)
+
+    return snapshot
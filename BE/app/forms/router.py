@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from app.auth.service import get_project_state
 from app.models import ProjectState
 from app.schemas import (
@@ -9,6 +9,7 @@ from app.schemas import (
     ResponsesPublic,
 )
 from app.forms import service as form_service
+from app.forms.pdf.executor import RenderPoolBrokenError
 import uuid
 import logging
 
@@ -111,15 +112,15 @@ async def download_form_pdf(
 ):
     """Generate and download PDF for a form"""
     try:
-        pdf_bytes = await form_service.generate_pdf_bytes(
+        content = await form_service.generate_pdf_stream(
             db=project_state.db,
             project=project_state.project,
             form_public_id=form_public_id,
         )
 
-        # Return PDF file as Response
-        return Response(
-            content=pdf_bytes,
+        # Stream the PDF instead of buffering a stored copy in memory
+        return StreamingResponse(
+            content,
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename=form_{form_public_id}.pdf",
@@ -132,6 +133,10 @@ async def download_form_pdf(
         if "not supported" in str(e):
             raise HTTPException(status_code=400, detail=str(e))
         raise HTTPException(status_code=404, detail=str(e))
+    except (TimeoutError, RenderPoolBrokenError) as e:
+        # Render pool saturated, render too slow, or a render process died
+        logger.warning(f"Form PDF render unavailable: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to generate form PDF: {e}")
         raise HTTPException(
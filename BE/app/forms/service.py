@@ -17,11 +17,17 @@ from app.schemas import (
     FieldOptionPublic,
     ResponsesPublic,
 )
-from app.documents.storage import storage
-from app.forms.pdf.fill_pdf import AcroFormFiller, XFAFormFiller
-from app.forms.pdf.dependency import check_dependency, get_dependency_target
+from app.documents.storage import storage, save_file_in_background
+from app.forms.pdf.fill_pdf import AcroFormFiller, XFAFormFiller, get_field_value_pair
+from app.forms.pdf import template_cache
+from app.forms.pdf.render import RENDER_VERSION
+from app.forms.pdf.dependency import get_typed_values
+from app.forms.responses import load_response_snapshot
 from app.forms import cache
 from collections import defaultdict
+from typing import AsyncIterator
+import hashlib
+import json
 import uuid
 import logging
 
@@ -111,25 +117,24 @@ async def get_section_fields(
             options_dict[field_id].append(option)
 
     # Code for checking dependency
-    dependency_targets = get_dependency_target(section.id, db)
+    dependency_graph = cache.get_dependency_graph(db, form.form_template_id)
+    dependency_targets = dependency_graph.targets_for(
+        field.key for field in template_fields.values()
+    )
     logger.info(f"Section {section.id} dependency_targets: {dependency_targets}")
 
+    # Load all responses for the form once, shared by rendering and dependency checks
+    responses = load_response_snapshot(db, form.id)
+    typed_values = get_typed_values(responses)
+
     fields_public = []
     for field_id, template_field in template_fields.items():
-        # Query response ad hoc for this specific field
-        response = (
-            db.query(FormFieldResponse)
-            .filter(
-                FormFieldResponse.form_id == form.id,
-                FormFieldResponse.form_template_field_id == field_id,
-            )
-            .first()
-        )
+        response = responses.get(field_id)
 
         should_show = True
-        if template_field.dependency_expression:
-            should_show = check_dependency(
-                template_field.dependency_expression, db, form.id
+        if template_field.key in dependency_graph.expressions:
+            should_show = dependency_graph.expressions[template_field.key].evaluate(
+                typed_values
             )
 
         if should_show:
@@ -192,6 +197,7 @@ async def submit_section_responses(
         # Process each field response
         template_fields = cache.get_template_fields_for_section(db, section.id)
         fields_by_key = {field.key: field for field in template_fields.values()}
+        changed_keys = set()
 
         for request_field_response in response_request.fields:
             logger.info(
@@ -229,12 +235,24 @@ async def submit_section_responses(
                     role=request_field_response.role,
                 )
                 db.add(db_field_response)
+                changed_keys.add(template_field.key)
             else:
+                if db_field_response.value != request_field_response.value:
+                    changed_keys.add(template_field.key)
                 db_field_response.value = request_field_response.value
                 db_field_response.role = request_field_response.role
 
         db.commit()
 
+        # Re-check only the fields whose dependency expressions reference a changed field
+        dependent_fields = {}
+        dependency_graph = cache.get_dependency_graph(db, form.form_template_id)
+        if dependency_graph.dependents_of(changed_keys):
+            responses = load_response_snapshot(db, form.id)
+            dependent_fields = dependency_graph.reevaluate(
+                changed_keys, get_typed_values(responses)
+            )
+
         # *** AUTOMATIC WORKFLOW EVALUATION ***
         logger.info("Triggering workflow evaluation after section submission")
         from app.workflow.workflow_evaluator import evaluate_workflow_completion
@@ -245,55 +263,84 @@ async def submit_section_responses(
             logger.error(f"Workflow evaluation failed: {eval_error}")
             # Don't fail the section submission if evaluation fails
 
-        return {"message": "Section responses submitted successfully"}
+        return {
+            "message": "Section responses submitted successfully",
+            "dependent_fields": dependent_fields,
+        }
 
     except Exception:
         db.rollback()
         raise
 
 
-async def generate_pdf_bytes(
+# Fillable template per form template name
+PDF_TEMPLATE_PATHS = {
+    "I-130": "app/forms/pdf/i-130-template.pdf",
+    "I-129": "app/forms/pdf/i-129_template.pdf",
+}
+
+
+def get_pdf_digest(form_template: FormTemplate, pdf_input_path: str, pair: dict) -> str:
+    """
+    Content address of a generated PDF: changes whenever the template record,
+    the template file, the renderer or the form's field values change.
+    """
+    key = json.dumps(
+        {
+            "template": form_template.name,
+            "template_version": form_template.version,
+            "template_file": template_cache.file_digest(pdf_input_path),
+            "render_version": RENDER_VERSION,
+            "fields": pair,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+async def generate_pdf_stream(
     *, db: DBSession, project: Project, form_public_id: uuid.UUID
-) -> bytes:
-    """Generate and return PDF for a form"""
+) -> AsyncIterator[bytes]:
+    """
+    Generate PDF for a form and return its content as chunks. An unchanged
+    form is streamed from the stored copy instead of being re-rendered.
+    """
     # Get and validate form
     form = await get_form_for_project(
         db=db, project=project, form_public_id=form_public_id
     )
 
-    if form.form_template.name == "I-130":
-        # PDF paths
-        pdf_output_path = f"documents/{project.client.public_id}/{project.public_id}/outputs/form_{form_public_id}.pdf"
-        pdf_input_path = "app/forms/pdf/i-130-template.pdf"
-
-        try:
-            # Fill PDF
-            pdf_filler = AcroFormFiller(pdf_input_path, pdf_output_path)
-            await pdf_filler.fill_pdf(form.id, db)
-
-            # Get PDF bytes from storage
-            pdf_bytes = await storage.get_file(pdf_output_path)
-            return pdf_bytes
+    pdf_input_path = PDF_TEMPLATE_PATHS.get(form.form_template.name)
+    if pdf_input_path is None:
+        raise ValueError("PDF Filler is not supported for this form")
 
-        except Exception:
-            raise
-    elif form.form_template.name == "I-129":
-        # PDF paths
-        pdf_output_path = f"documents/{project.client.public_id}/{project.public_id}/outputs/form_{form_public_id}.pdf"
-        pdf_input_path = "app/forms/pdf/i-129_template.pdf"
+    pair = get_field_value_pair(db, form.id)
+    digest = get_pdf_digest(form.form_template, pdf_input_path, pair)
+    pdf_output_prefix = f"documents/{project.client.public_id}/{project.public_id}/outputs/form_{form_public_id}_"
+    pdf_output_path = f"{pdf_output_prefix}{digest}.pdf"
 
+    # Same template and answers as a previous download
+    if await storage.exists(pdf_output_path):
         try:
-            # Fill PDF
-            pdf_filler = AcroFormFiller(pdf_input_path, pdf_output_path)
-            await pdf_filler.fill_pdf(form.id, db)
+            return await storage.open_stream(pdf_output_path)
+        except FileNotFoundError:
+            logger.warning(f"Cached PDF disappeared, re-rendering: {pdf_output_path}")
+
+    # Fill PDF
+    pdf_filler = AcroFormFiller(pdf_input_path, pdf_output_path)
+    pdf_bytes = await pdf_filler.fill_pdf(form.id, db, pair=pair)
+
+    # Keep a copy for repeat downloads without holding up the response,
+    # replacing the copy rendered from older answers
+    save_file_in_background(
+        pdf_bytes, pdf_output_path, superseded_prefix=pdf_output_prefix
+    )
 
-            # Get PDF bytes from storage
-            pdf_bytes = await storage.get_file(pdf_output_path)
-            return pdf_bytes
+    async def rendered():
+        yield pdf_bytes
 
-        except Exception:
-            raise
-    raise ValueError("PDF Filler is not supported for this form")
+    return rendered()
 
 
 async def get_response_value_from_project_form(
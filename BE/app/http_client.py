@@ -0,0 +1,36 @@
+"""
+Shared settings for the long-lived httpx clients of the Lambda services
+(VisionService, OnetClassifierService). Each service owns one AsyncClient
+per API worker so connections (and TLS sessions) are reused across calls.
+"""
+
+import httpx
+import os
+
+# Connection pool per client
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+# Seconds to wait for a free pooled connection before failing the call
+HTTP_POOL_TIMEOUT_SECONDS = float(os.getenv("HTTP_POOL_TIMEOUT_SECONDS", "10"))
+# HTTP/2 multiplexing, requires the h2 package (pip install "httpx[http2]")
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "False")
+
+
+def request_timeout(timeout: float) -> httpx.Timeout:
+    """Per-call timeout that keeps the configured pool wait"""
+    return httpx.Timeout(timeout, pool=HTTP_POOL_TIMEOUT_SECONDS)
+
+
+def create_async_client(timeout: float = 30.0, **kwargs) -> httpx.AsyncClient:
+    """AsyncClient with the configured pool limits and keep-alive"""
+    return httpx.AsyncClient(
+        timeout=request_timeout(timeout),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        http2=HTTP2_ENABLED == "True",
+        **kwargs,
+    )
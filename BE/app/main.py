@@ -1,19 +1,116 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from app.auth.router import router as users_router, auth_router as auth_router
 from app.projects.router import router as projects_router
 from app.forms.router import router as forms_router
-from app.documents.router import router as documents_router
+from app.documents.router import (
+    router as documents_router,
+    storage_router as documents_storage_router,
+)
 from app.workflow.router import router as workflow_router
 from app.clients.router import router as clients_router
 from app.wages.router import router as wages_router
 from app.cache import router as cache_router
+from app.database import SessionLocal
+from app.forms import cache as forms_cache
+from app.wages import index as wage_index
+from app.forms.pdf import executor as pdf_executor
+from app.documents.storage import storage, wait_for_background_saves
+from app.documents import pipeline as document_pipeline
+from app.documents.vision_service import vision_service
+from app.wages.onet_classifier_service import onet_classifier_service
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger("uvicorn.error")
 
 API_VERSION = "0.1.1"
 
+# Preload all ACTIVE form templates into the forms cache at startup
+FORMS_CACHE_WARMUP = os.getenv("FORMS_CACHE_WARMUP", "True")
+# Build the in-memory wage tier index at startup instead of on the first lookup
+WAGE_INDEX_WARMUP = os.getenv("WAGE_INDEX_WARMUP", "True")
+
+
+def _warm_up_forms_cache() -> dict:
+    db = SessionLocal()
+    try:
+        return forms_cache.warm_up(db)
+    finally:
+        db.close()
+
+
+async def warm_up_forms_cache(app: FastAPI):
+    """Warm the forms cache off the event loop, then mark the app ready."""
+    started_at = time.perf_counter()
+    try:
+        loaded = await asyncio.to_thread(_warm_up_forms_cache)
+        logger.info(
+            f"Forms cache warm-up finished in {time.perf_counter() - started_at:.2f}s: {loaded}"
+        )
+    except Exception as e:
+        # The cache still fills lazily, so don't keep the worker unready forever
+        logger.error(
+            f"Forms cache warm-up failed after {time.perf_counter() - started_at:.2f}s: {e}"
+        )
+    finally:
+        app.state.ready = True
+
+
+def _warm_up_wage_index() -> int:
+    db = SessionLocal()
+    try:
+        return len(wage_index.get_index(db))
+    finally:
+        db.close()
+
+
+async def warm_up_wage_index():
+    """Load the wage index off the event loop; lookups load it lazily if this fails."""
+    try:
+        await asyncio.to_thread(_warm_up_wage_index)
+    except Exception as e:
+        logger.error(f"Wage index warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    pdf_executor.start()
+    await storage.start()
+    vision_service.start()
+    onet_classifier_service.start()
+    await document_pipeline.start()
+    warmup_task = None
+    if FORMS_CACHE_WARMUP == "True":
+        warmup_task = asyncio.create_task(warm_up_forms_cache(app))
+    else:
+        app.state.ready = True
+    wage_warmup_task = None
+    if WAGE_INDEX_WARMUP == "True":
+        wage_warmup_task = asyncio.create_task(warm_up_wage_index())
+
+    yield
+
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    if wage_warmup_task and not wage_warmup_task.done():
+        wage_warmup_task.cancel()
+    pdf_executor.shutdown()
+    await document_pipeline.stop()
+    await wait_for_background_saves()
+    await vision_service.close()
+    await onet_classifier_service.close()
+    await storage.close()
+
+
 app = FastAPI(title="Crossing Legal AI API",
-              description="", version=API_VERSION)
+              description="", version=API_VERSION, lifespan=lifespan)
 
 app.add_middleware(ProxyHeadersMiddleware)
 
@@ -37,6 +134,11 @@ app.include_router(
     prefix="/projects/{project_public_id}/documents",
     tags=["documents"],
 )
+app.include_router(
+    documents_storage_router,
+    prefix="/storage/local",
+    tags=["documents"],
+)
 app.include_router(
     workflow_router,
     prefix="/projects/{project_public_id}/steps",
@@ -56,3 +158,13 @@ app.include_router(cache_router.router,
 @app.get("/")
 async def health_check():
     return {"version": API_VERSION, "message": "OK"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until startup work (forms cache warm-up) completes"""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(
+            status_code=503, content={"version": API_VERSION, "message": "Starting"}
+        )
+    return {"version": API_VERSION, "message": "OK"}
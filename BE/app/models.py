@@ -11,6 +11,7 @@ from sqlalchemy import (
     Enum as SQLAlchemyEnum,
     UUID,
     UniqueConstraint,
+    Index,
     text,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
@@ -36,6 +37,7 @@ class ProjectDetailType(Enum):
     """Types of project-specific details"""
     SOC_CODE = "SOC_CODE"
     WAGE_TIERS = "WAGE_TIERS"
+    WAGE_VINTAGE = "WAGE_VINTAGE"
 class User(Base):
     __tablename__ = "user"
 
@@ -336,6 +338,13 @@ class DocumentType(Base):
     documents: Mapped[List["Document"]] = relationship(back_populates="inferred_type")
 
 
+class DocumentProcessingStatus(Enum):
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
 class Document(Base):
     __tablename__ = "document"
 
@@ -372,6 +381,26 @@ class Document(Base):
     extracted_data: Mapped[dict | None] = mapped_column(
         JSON, nullable=True
     )  # JSON key-value pairs
+    # SHA-256 of the file content, used to reuse vision results of identical files
+    content_sha256: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True, index=True
+    )
+    # Set when the content is shared with an identical earlier upload of the
+    # project; None means the blob lives at the document's own upload path
+    storage_path: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+
+    # Background vision processing (app/documents/pipeline.py)
+    processing_status: Mapped[DocumentProcessingStatus] = mapped_column(
+        SQLAlchemyEnum(DocumentProcessingStatus, native_enum=False),
+        default=DocumentProcessingStatus.PENDING,
+        server_default=text("'PENDING'"),
+        nullable=False,
+        index=True,
+    )
+    processing_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    processing_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     # Foreign Key and Relationship
     project_id: Mapped[int] = mapped_column(
@@ -440,6 +469,11 @@ class FormTemplate(Base):
         default=FormTemplateStatus.ACTIVE,
         server_default=text("'ACTIVE'"),
     )
+    # Bumped by database triggers whenever the template, its sections, fields or
+    # options change. Workers compare it to invalidate their template cache.
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
 
     # Foreign Key and Relationship
     sections: Mapped[List["FormTemplateSection"]] = relationship(
@@ -746,6 +780,38 @@ class ProjectWorkflowStep(Base):
     )
 
 
+class WageVintage(Base):
+    """
+    One release of wage data (e.g. an OFLC year). Zip areas and area jobs
+    belong to a vintage; exactly one vintage is active and serves lookups,
+    older ones stay queryable so past determinations can be reproduced.
+    """
+
+    __tablename__ = "wage_vintage"
+    __table_args__ = (
+        # At most one active vintage
+        Index(
+            "uq_wage_vintage_is_active",
+            "is_active",
+            unique=True,
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
+    effective_date: Mapped[Optional[datetime.date]] = mapped_column(Date, nullable=True)
+    is_active: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default=text("false")
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=text("now()")
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=text("now()"), onupdate=text("now()")
+    )
+
+
 class WageArea(Base):
     __tablename__ = "wage_area"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -764,9 +830,14 @@ class WageArea(Base):
 class WageZipArea(Base):
     __tablename__ = "wage_zip_area"
     __table_args__ = (
-        UniqueConstraint("zip", "area_id", name="uq_wage_zip_area_zip_area_id"),
+        UniqueConstraint(
+            "vintage_id", "zip", "area_id", name="uq_wage_zip_area_vintage_id_zip_area_id"
+        ),
     )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    vintage_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("wage_vintage.id"), nullable=False
+    )
     zip: Mapped[str] = mapped_column(String(5), nullable=False, index=True)
     area_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("wage_area.id"), nullable=False
@@ -801,9 +872,15 @@ class WageJob(Base):
 class WageAreaJob(Base):
     __tablename__ = "wage_area_job"
     __table_args__ = (
-        UniqueConstraint("area_id", "job_id", name="uq_wage_area_job_area_id_job_id"),
+        UniqueConstraint(
+            "vintage_id", "area_id", "job_id",
+            name="uq_wage_area_job_vintage_id_area_id_job_id",
+        ),
     )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    vintage_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("wage_vintage.id"), nullable=False
+    )
     area_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("wage_area.id"), nullable=False
     )
@@ -822,3 +899,41 @@ class WageAreaJob(Base):
     updated_at: Mapped[datetime.datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=text("now()"), onupdate=text("now()")
     )
+
+
+class WageDataVersion(Base):
+    """
+    Single-row counter bumped by triggers on every change to the wage tables,
+    so each worker's in-memory wage index (app/wages/index.py) knows when to reload.
+    """
+
+    __tablename__ = "wage_data_version"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+
+
+class SocInference(Base):
+    """
+    SOC code inferred by the ONET classifier for a document content hash,
+    so identical employment letters are downloaded and classified once per
+    classifier version.
+    """
+
+    __tablename__ = "soc_inference"
+    __table_args__ = (
+        UniqueConstraint(
+            "content_sha256", "classifier_version",
+            name="uq_soc_inference_content_sha256_classifier_version",
+        ),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    classifier_version: Mapped[str] = mapped_column(String(50), nullable=False)
+    soc_code: Mapped[str] = mapped_column(String(15), nullable=False)
+    # Text extracted from the document, None when the classifier read the file itself
+    job_description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=text("now()")
+    )
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime, date
 from typing import List, Optional
 from app.models import (
+    DocumentProcessingStatus,
     FormTemplateFieldSubTypes,
     FormTemplateFieldTypes,
     ProjectFilingType,
@@ -209,12 +210,38 @@ class DocumentPublic(CamelModel):
         None, description="Resolved document type"
     )
     extracted_data: dict | None = Field(None, description="Document extracted data")
+    processing_status: DocumentProcessingStatus = Field(
+        ..., description="Vision processing status (PENDING, PROCESSING, COMPLETED, FAILED)"
+    )
+    processing_error: str | None = Field(
+        None, description="Last processing error, if any"
+    )
 
 
 class DocumentsPublic(CamelModel):
     documents: list[DocumentPublic] = Field(..., description="List of documents")
 
 
+class DocumentUploadRequest(CamelModel):
+    name: str = Field(..., description="File name, e.g. passport.pdf")
+    content_type: str = Field(..., description="File content type, e.g. application/pdf")
+
+
+class DocumentUploadPublic(CamelModel):
+    public_id: uuid.UUID = Field(..., description="Public ID reserved for the document")
+    upload_url: str = Field(..., description="URL to PUT the file content to")
+    method: str = Field("PUT", description="HTTP method for the upload")
+    headers: dict[str, str] = Field(
+        default_factory=dict, description="Headers the upload request must send"
+    )
+    expires_in: int = Field(..., description="Seconds until the upload URL expires")
+
+
+class DocumentUrlPublic(CamelModel):
+    url: str = Field(..., description="Time-limited URL to download the document")
+    expires_in: int = Field(..., description="Seconds until the URL expires")
+
+
 # ============================================================================
 # FORMS
 # ============================================================================
@@ -317,6 +344,36 @@ class WageTierPublic(CamelModel):
     job_code: str | None = Field(None, description="SOC/OES code")
     job_name: str | None = Field(None, description="Job name")
     job_description: str | None = Field(None, description="Job description")
+    vintage: str | None = Field(None, description="Wage data vintage the tiers come from")
+
+
+class WageTierQuery(CamelModel):
+    zip_code: str = Field(..., description="Worksite zip code")
+    soc_code: str = Field(..., description="SOC/OES code")
+
+
+class WageTierBatchRequest(CamelModel):
+    items: list[WageTierQuery] = Field(
+        ..., max_length=500, description="Zip code and SOC code pairs to look up"
+    )
+    vintage: str | None = Field(
+        None, description="Wage data vintage, defaults to the active one"
+    )
+
+
+class WageTierBatchItemPublic(CamelModel):
+    zip_code: str = Field(..., description="Zip code as requested")
+    soc_code: str = Field(..., description="SOC code as requested")
+    tiers: WageTierPublic | None = Field(None, description="Wage tiers, if found")
+    error: str | None = Field(None, description="Why the lookup failed")
+
+
+class WageTierBatchPublic(CamelModel):
+    vintage: str = Field(..., description="Wage data vintage of all results")
+    results: list[WageTierBatchItemPublic] = Field(
+        ..., description="One result per requested item, in request order"
+    )
+
 
 class WorkflowStepSchema(BaseModel):
     id: int
@@ -0,0 +1,452 @@
+"""
+OFLC wage data import
+
+Loads the yearly OFLC (flcdatacenter.com) files and a zip code to wage area
+crosswalk into a wage vintage: wage_area and wage_job (shared by all
+vintages) and the vintage's wage_zip_area and wage_area_job rows:
+
+    --areas   Geography.csv     Area, AreaName
+    --jobs    oes_soc_occs.csv  soccode, Title, Description
+    --wages   ALC_Export.csv    Area, SocCode, Level1, Level2, Level3, Level4
+    --zips    crosswalk CSV     Zip (or ZipCode / Zip_Code), Area
+
+Header names are matched case-insensitively and extra columns are ignored.
+Each file is streamed as-is into a TEMP staging table with PostgreSQL COPY,
+then the vintage is refreshed with set-based upserts and deletes in one
+transaction. The active vintage can't be imported into, so lookups never see
+a half-imported year; activating a vintage is a separate, atomic switch (or
+--activate, in the import's transaction). Either bumps wage_data_version, so
+every worker's wage index reloads on its next version check.
+
+Usage (from BE/):
+    uv run python -m app.wages.importer import FY2025 --effective-date 2025-07-01 \\
+        --areas Geography.csv --jobs oes_soc_occs.csv --wages ALC_Export.csv \\
+        --zips zip_area.csv [--activate]
+    uv run python -m app.wages.importer activate FY2025
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from psycopg2 import sql
+from typing import IO
+import argparse
+import csv
+import logging
+import time
+
+from app.database import engine
+
+logger = logging.getLogger("uvicorn.error")
+
+# OFLC publishes hourly wages; the wage tables hold annual ones
+HOURS_PER_YEAR = 2080
+
+# Serializes concurrent imports (arbitrary application-wide key)
+IMPORT_LOCK_KEY = 729_114_001
+
+
+@dataclass(frozen=True)
+class StagingFile:
+    table: str
+    # staging column -> accepted header names (lowercase)
+    columns: dict[str, tuple[str, ...]]
+
+
+AREAS = StagingFile(
+    "wage_import_area", {"code": ("area",), "name": ("areaname", "area_name")}
+)
+JOBS = StagingFile(
+    "wage_import_job",
+    {
+        "code": ("soccode", "soc_code"),
+        "name": ("title",),
+        "description": ("description",),
+    },
+)
+WAGES = StagingFile(
+    "wage_import_area_job",
+    {
+        "area": ("area",),
+        "soc_code": ("soccode", "soc_code"),
+        "level_1": ("level1",),
+        "level_2": ("level2",),
+        "level_3": ("level3",),
+        "level_4": ("level4",),
+    },
+)
+ZIPS = StagingFile(
+    "wage_import_zip_area",
+    {"zip": ("zip", "zipcode", "zip_code"), "area": ("area",)},
+)
+
+
+@dataclass
+class ImportResult:
+    vintage_id: int = 0
+    activated: bool = False
+    areas: int = 0
+    jobs: int = 0
+    zip_areas: int = 0
+    area_jobs: int = 0
+    deleted_zip_areas: int = 0
+    deleted_area_jobs: int = 0
+    skipped_area_jobs: int = 0
+
+
+def _header(file: IO[str]) -> list[str]:
+    line = file.readline()
+    if not line:
+        raise ValueError(f"{getattr(file, 'name', 'file')} is empty")
+    return [name.strip().lower() for name in next(csv.reader([line]))]
+
+
+def stage(cursor, file: IO[str], staging: StagingFile) -> int:
+    """
+    COPY a CSV file into a TEMP table with one text column per header column,
+    then expose the needed columns under their staging names as a view.
+    """
+    header = _header(file)
+    raw_table = f"{staging.table}_raw"
+
+    selected = []
+    for column, accepted in staging.columns.items():
+        source = next((name for name in header if name in accepted), None)
+        if source is None:
+            raise ValueError(
+                f"{getattr(file, 'name', staging.table)}: missing column "
+                f"{' / '.join(accepted)} (found {', '.join(header)})"
+            )
+        selected.append(
+            sql.SQL("NULLIF(btrim({}), '') AS {}").format(
+                sql.Identifier(source), sql.Identifier(column)
+            )
+        )
+
+    # Duplicate or blank header names still need distinct raw columns
+    raw_columns = [
+        sql.Identifier(name if name and header.index(name) == i else f"column_{i}")
+        for i, name in enumerate(header)
+    ]
+    cursor.execute(
+        sql.SQL("CREATE TEMP TABLE {} ({}) ON COMMIT DROP").format(
+            sql.Identifier(raw_table),
+            sql.SQL(", ").join(sql.SQL("{} text").format(c) for c in raw_columns),
+        )
+    )
+    # The header line was already consumed, COPY streams the rest
+    cursor.copy_expert(
+        sql.SQL("COPY {} FROM STDIN WITH (FORMAT csv)")
+        .format(sql.Identifier(raw_table))
+        .as_string(cursor),
+        file,
+    )
+    rows = cursor.rowcount
+    # Temp tables are never auto-analyzed, without stats the joins below nest-loop
+    cursor.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(raw_table)))
+    cursor.execute(
+        sql.SQL("CREATE TEMP VIEW {} AS SELECT {} FROM {}").format(
+            sql.Identifier(staging.table),
+            sql.SQL(", ").join(selected),
+            sql.Identifier(raw_table),
+        )
+    )
+    return rows
+
+
+UPSERT_VINTAGE = """
+INSERT INTO wage_vintage (name, effective_date)
+VALUES (%(name)s, %(effective_date)s)
+ON CONFLICT (name) DO UPDATE
+SET effective_date = coalesce(EXCLUDED.effective_date, wage_vintage.effective_date),
+    updated_at = now()
+RETURNING id, is_active
+"""
+
+# Set-based refresh of a vintage from the staging views. Areas and jobs are
+# upserted and kept (other vintages may still reference them); the vintage's
+# zip areas and area jobs missing from the import are deleted.
+UPSERT_AREAS = """
+INSERT INTO wage_area (code, name)
+SELECT DISTINCT ON (code) code, coalesce(name, code)
+FROM wage_import_area
+WHERE code IS NOT NULL
+ORDER BY code
+ON CONFLICT (code) DO UPDATE
+SET name = EXCLUDED.name, updated_at = now()
+WHERE wage_area.name IS DISTINCT FROM EXCLUDED.name
+"""
+
+UPSERT_JOBS = """
+INSERT INTO wage_job (code, name, description)
+SELECT DISTINCT ON (code) code, coalesce(name, code), coalesce(description, '')
+FROM wage_import_job
+WHERE code IS NOT NULL
+ORDER BY code
+ON CONFLICT (code) DO UPDATE
+SET name = EXCLUDED.name, description = EXCLUDED.description, updated_at = now()
+WHERE (wage_job.name, wage_job.description)
+    IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.description)
+"""
+
+STAGE_ZIP_AREAS = """
+CREATE TEMP TABLE wage_import_zip_area_ids ON COMMIT DROP AS
+SELECT DISTINCT lpad(z.zip, 5, '0') AS zip, a.id AS area_id
+FROM wage_import_zip_area z
+JOIN wage_area a ON a.code = z.area
+WHERE z.zip ~ '^[0-9]{3,5}$'
+"""
+
+DELETE_ZIP_AREAS = """
+DELETE FROM wage_zip_area w
+WHERE w.vintage_id = %(vintage_id)s AND NOT EXISTS (
+    SELECT 1 FROM wage_import_zip_area_ids s
+    WHERE s.zip = w.zip AND s.area_id = w.area_id
+)
+"""
+
+INSERT_ZIP_AREAS = """
+INSERT INTO wage_zip_area (vintage_id, zip, area_id)
+SELECT %(vintage_id)s, zip, area_id FROM wage_import_zip_area_ids
+ON CONFLICT ON CONSTRAINT uq_wage_zip_area_vintage_id_zip_area_id DO NOTHING
+"""
+
+# Wage levels are checked after the join: the planner estimates the regex
+# filters on the staged text at ~1 row and would nested-loop the whole file
+# against every area, while MATERIALIZED keeps it from pushing them down
+STAGE_AREA_JOBS = """
+CREATE TEMP TABLE wage_import_area_job_ids ON COMMIT DROP AS
+WITH joined AS MATERIALIZED (
+    SELECT a.id AS area_id, j.id AS job_id, w.level_1, w.level_2, w.level_3, w.level_4
+    FROM wage_import_area_job w
+    JOIN wage_area a ON a.code = w.area
+    JOIN wage_job j ON j.code = w.soc_code
+)
+SELECT DISTINCT ON (area_id, job_id)
+    area_id,
+    job_id,
+    round(level_1::numeric * %(multiplier)s, 2) AS wage_tier_1,
+    round(level_2::numeric * %(multiplier)s, 2) AS wage_tier_2,
+    round(level_3::numeric * %(multiplier)s, 2) AS wage_tier_3,
+    round(level_4::numeric * %(multiplier)s, 2) AS wage_tier_4
+FROM joined
+WHERE level_1 ~ '^[0-9]+(\\.[0-9]+)?$' AND level_2 ~ '^[0-9]+(\\.[0-9]+)?$'
+    AND level_3 ~ '^[0-9]+(\\.[0-9]+)?$' AND level_4 ~ '^[0-9]+(\\.[0-9]+)?$'
+ORDER BY area_id, job_id
+"""
+
+DELETE_AREA_JOBS = """
+DELETE FROM wage_area_job w
+WHERE w.vintage_id = %(vintage_id)s AND NOT EXISTS (
+    SELECT 1 FROM wage_import_area_job_ids s
+    WHERE s.area_id = w.area_id AND s.job_id = w.job_id
+)
+"""
+
+UPSERT_AREA_JOBS = """
+INSERT INTO wage_area_job
+    (vintage_id, area_id, job_id, wage_tier_1, wage_tier_2, wage_tier_3, wage_tier_4)
+SELECT %(vintage_id)s, area_id, job_id, wage_tier_1, wage_tier_2, wage_tier_3, wage_tier_4
+FROM wage_import_area_job_ids
+ON CONFLICT ON CONSTRAINT uq_wage_area_job_vintage_id_area_id_job_id DO UPDATE
+SET wage_tier_1 = EXCLUDED.wage_tier_1,
+    wage_tier_2 = EXCLUDED.wage_tier_2,
+    wage_tier_3 = EXCLUDED.wage_tier_3,
+    wage_tier_4 = EXCLUDED.wage_tier_4,
+    updated_at = now()
+WHERE (wage_area_job.wage_tier_1, wage_area_job.wage_tier_2,
+       wage_area_job.wage_tier_3, wage_area_job.wage_tier_4)
+    IS DISTINCT FROM (EXCLUDED.wage_tier_1, EXCLUDED.wage_tier_2,
+                      EXCLUDED.wage_tier_3, EXCLUDED.wage_tier_4)
+"""
+
+
+def _activate(cursor, vintage_id: int) -> None:
+    """Make a vintage the active one. Both updates commit together, so readers switch atomically."""
+    cursor.execute(
+        "SELECT count(*) FROM wage_area_job WHERE vintage_id = %s", (vintage_id,)
+    )
+    if not cursor.fetchone()[0]:
+        raise ValueError("Refusing to activate a wage vintage without wage data")
+    cursor.execute(
+        "UPDATE wage_vintage SET is_active = false, updated_at = now() "
+        "WHERE is_active AND id <> %s",
+        (vintage_id,),
+    )
+    cursor.execute(
+        "UPDATE wage_vintage SET is_active = true, updated_at = now() "
+        "WHERE id = %s AND NOT is_active",
+        (vintage_id,),
+    )
+
+
+def activate_vintage(name: str) -> int:
+    """Switch lookups to another (already imported) vintage"""
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (IMPORT_LOCK_KEY,))
+            cursor.execute("SELECT id FROM wage_vintage WHERE name = %s", (name,))
+            row = cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Wage vintage {name} not found")
+            _activate(cursor, row[0])
+        connection.commit()
+        logger.info(f"Wage vintage {name} activated")
+        return row[0]
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def import_wage_data(
+    *,
+    vintage: str,
+    areas: IO[str],
+    jobs: IO[str],
+    wages: IO[str],
+    zips: IO[str],
+    effective_date: date | None = None,
+    hourly: bool = True,
+    activate: bool = False,
+) -> ImportResult:
+    """Load the given files into a (new or inactive) vintage in one transaction"""
+    result = ImportResult()
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (IMPORT_LOCK_KEY,))
+
+            cursor.execute(
+                UPSERT_VINTAGE, {"name": vintage, "effective_date": effective_date}
+            )
+            vintage_id, is_active = cursor.fetchone()
+            if is_active:
+                raise ValueError(
+                    f"Wage vintage {vintage} is active, import into a new vintage and activate it"
+                )
+            result.vintage_id = vintage_id
+            params = {"vintage_id": vintage_id}
+
+            started_at = time.perf_counter()
+            staged = {
+                staging.table: stage(cursor, file, staging)
+                for staging, file in (
+                    (AREAS, areas),
+                    (JOBS, jobs),
+                    (WAGES, wages),
+                    (ZIPS, zips),
+                )
+            }
+            logger.info(
+                f"Staged wage files in {time.perf_counter() - started_at:.2f}s: {staged}"
+            )
+
+            cursor.execute(UPSERT_AREAS)
+            result.areas = cursor.rowcount
+            cursor.execute(UPSERT_JOBS)
+            result.jobs = cursor.rowcount
+            # Fresh stats so the code joins don't plan for the pre-import sizes
+            cursor.execute("ANALYZE wage_area, wage_job")
+
+            cursor.execute(STAGE_ZIP_AREAS)
+            cursor.execute("ANALYZE wage_import_zip_area_ids")
+            cursor.execute(DELETE_ZIP_AREAS, params)
+            result.deleted_zip_areas = cursor.rowcount
+            cursor.execute(INSERT_ZIP_AREAS, params)
+            result.zip_areas = cursor.rowcount
+
+            cursor.execute(
+                STAGE_AREA_JOBS, {"multiplier": HOURS_PER_YEAR if hourly else 1}
+            )
+            result.skipped_area_jobs = staged[WAGES.table] - cursor.rowcount
+            cursor.execute("ANALYZE wage_import_area_job_ids")
+            cursor.execute(DELETE_AREA_JOBS, params)
+            result.deleted_area_jobs = cursor.rowcount
+            cursor.execute(UPSERT_AREA_JOBS, params)
+            result.area_jobs = cursor.rowcount
+
+            if activate:
+                _activate(cursor, vintage_id)
+                result.activated = True
+
+        connection.commit()
+        logger.info(
+            f"Wage vintage {vintage} imported in {time.perf_counter() - started_at:.2f}s: {result}"
+        )
+        return result
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.wages.importer",
+        description="Import OFLC wage data into wage vintages",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="load OFLC files into a vintage")
+    import_parser.add_argument("vintage", help="vintage name, e.g. FY2025")
+    import_parser.add_argument(
+        "--effective-date", type=date.fromisoformat, help="YYYY-MM-DD"
+    )
+    import_parser.add_argument("--areas", required=True, help="OFLC Geography.csv")
+    import_parser.add_argument("--jobs", required=True, help="OFLC oes_soc_occs.csv")
+    import_parser.add_argument(
+        "--wages", required=True, help="OFLC ALC_Export.csv (or EDC_Export.csv)"
+    )
+    import_parser.add_argument(
+        "--zips", required=True, help="zip code to OFLC area crosswalk CSV"
+    )
+    import_parser.add_argument(
+        "--annual",
+        action="store_true",
+        help="wage levels in the file are already annual (default: hourly, x2080)",
+    )
+    import_parser.add_argument(
+        "--encoding", default="utf-8-sig", help="encoding of the CSV files"
+    )
+    import_parser.add_argument(
+        "--activate", action="store_true", help="make the vintage active once imported"
+    )
+
+    activate_parser = commands.add_parser("activate", help="switch lookups to a vintage")
+    activate_parser.add_argument("vintage", help="vintage name")
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "activate":
+        activate_vintage(args.vintage)
+        return
+
+    def open_csv(path: str) -> IO[str]:
+        return open(path, newline="", encoding=args.encoding)
+
+    with (
+        open_csv(args.areas) as areas,
+        open_csv(args.jobs) as jobs,
+        open_csv(args.wages) as wages,
+        open_csv(args.zips) as zips,
+    ):
+        result = import_wage_data(
+            vintage=args.vintage,
+            effective_date=args.effective_date,
+            areas=areas,
+            jobs=jobs,
+            wages=wages,
+            zips=zips,
+            hourly=not args.annual,
+            activate=args.activate,
+        )
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+In-memory wage tier index
+
+OFLC wage data changes about once a year, but every lookup used to join
+wage_zip_area, wage_area, wage_job and wage_area_job. Each worker instead
+keeps the whole dataset in a few packed arrays:
+
+    zip code     -> area ids       sorted zip keys + offsets into an area id array
+    SOC code     -> job id         dict (about a thousand jobs)
+    (area, job)  -> 4 tier values  sorted (area << 32 | job) keys, tiers packed
+                                   four per row in an array of doubles
+
+so a lookup is a couple of bisects and dict hits (microseconds) and no query.
+
+There is one index per wage vintage (wage_vintage): the active vintage serves
+lookups by default, and past vintages can be loaded to reproduce earlier
+determinations. A single index is an immutable snapshot, so one lookup (or one
+request holding it) never mixes two vintages. Up to WAGE_INDEX_MAX_VINTAGES
+indexes are kept per worker.
+
+The wage_data_version row is bumped by triggers whenever a wage table or the
+active vintage changes. Workers re-read it at most every
+WAGE_INDEX_VERSION_CHECK_SECONDS. When it moved, they keep serving their
+current indexes while replacements build on a background thread, then swap
+the new snapshot in. Builds take seconds at OFLC size and never run on the
+event loop; async code awaits a first load with get_index_async.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from sqlalchemy.orm import Session as DBSession
+from typing import Mapping, Optional
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.models import (
+    WageArea,
+    WageAreaJob,
+    WageDataVersion,
+    WageJob,
+    WageVintage,
+    WageZipArea,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+# How often (seconds) a worker re-reads the wage data version. 0 checks on every lookup.
+VERSION_CHECK_INTERVAL_SECONDS = float(
+    os.getenv("WAGE_INDEX_VERSION_CHECK_SECONDS", "60")
+)
+# Vintage indexes kept per worker (the active one plus recently pinned ones)
+MAX_VINTAGES = int(os.getenv("WAGE_INDEX_MAX_VINTAGES", "2"))
+# Rows fetched per round trip while loading an index
+LOAD_BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True, slots=True)
+class WageAreaInfo:
+    code: str
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class WageJobInfo:
+    id: int
+    code: str
+    name: str
+    description: str
+
+
+@dataclass(frozen=True, slots=True)
+class WageTiers:
+    area_id: int
+    job_id: int
+    tiers: tuple[float, float, float, float]
+
+
+def _is_zip(zip_code: str) -> bool:
+    return len(zip_code) == 5 and zip_code.isdigit()
+
+
+class WageIndex:
+    """Immutable snapshot of one wage vintage"""
+
+    def __init__(
+        self,
+        vintage_id: int,
+        vintage_name: str,
+        areas: Mapping[int, WageAreaInfo],
+        jobs: Mapping[int, WageJobInfo],
+        zip_areas: list[tuple[str, int]],
+        area_jobs: list[tuple[int, int, float, float, float, float]],
+    ):
+        self.vintage_id = vintage_id
+        self.vintage_name = vintage_name
+        # wage_data_version the index was built at, set by _build
+        self.data_version: Optional[int] = None
+        self.areas = areas
+        self.jobs = jobs
+        self.job_ids = {job.code: job.id for job in jobs.values()}
+
+        # zip -> area ids, CSR layout: areas of zip_keys[i] are
+        # zip_area_ids[zip_offsets[i]:zip_offsets[i + 1]]
+        self.zip_keys = array("I")
+        self.zip_offsets = array("I")
+        self.zip_area_ids = array("I")
+        for zip_code, area_id in sorted(zip_areas):
+            if not _is_zip(zip_code):
+                continue
+            key = int(zip_code)
+            if not self.zip_keys or self.zip_keys[-1] != key:
+                self.zip_keys.append(key)
+                self.zip_offsets.append(len(self.zip_area_ids))
+            self.zip_area_ids.append(area_id)
+        self.zip_offsets.append(len(self.zip_area_ids))
+
+        # (area, job) -> tiers, row i holds tiers[4 * i:4 * i + 4]
+        self.area_job_keys = array("Q")
+        self.tiers = array("d")
+        for area_id, job_id, *tiers in sorted(area_jobs):
+            self.area_job_keys.append(area_id << 32 | job_id)
+            self.tiers.extend(tiers)
+
+    def __len__(self) -> int:
+        return len(self.area_job_keys)
+
+    def area_ids_for_zip(self, zip_code: str) -> array:
+        """Wage area ids of a 5-digit zip code, in ascending order"""
+        if not _is_zip(zip_code):
+            return array("I")
+        key = int(zip_code)
+        i = bisect_left(self.zip_keys, key)
+        if i == len(self.zip_keys) or self.zip_keys[i] != key:
+            return array("I")
+        return self.zip_area_ids[self.zip_offsets[i]:self.zip_offsets[i + 1]]
+
+    def job_id_for_soc(self, soc_code: str) -> Optional[int]:
+        return self.job_ids.get(soc_code)
+
+    def tiers_for(self, area_id: int, job_id: int) -> Optional[tuple[float, ...]]:
+        key = area_id << 32 | job_id
+        i = bisect_left(self.area_job_keys, key)
+        if i == len(self.area_job_keys) or self.area_job_keys[i] != key:
+            return None
+        return tuple(self.tiers[4 * i:4 * i + 4])
+
+    def lookup(self, zip_code: str, soc_code: str) -> Optional[WageTiers]:
+        """Tiers of the first area of the zip code that has wage data for the SOC code"""
+        job_id = self.job_id_for_soc(soc_code)
+        if job_id is None:
+            return None
+        for area_id in self.area_ids_for_zip(zip_code):
+            tiers = self.tiers_for(area_id, job_id)
+            if tiers is not None:
+                return WageTiers(area_id=area_id, job_id=job_id, tiers=tiers)
+        return None
+
+
+_indexes: "OrderedDict[int, WageIndex]" = OrderedDict()
+# Future of the in-flight build per vintage id
+_loads: dict[int, Future] = {}
+_data_version: Optional[int] = None
+_active_vintage_id: Optional[int] = None
+# Last index served for the active vintage, kept while a newly activated one loads
+_last_active: Optional[WageIndex] = None
+_vintage_ids: dict[str, int] = {}
+_version_checked_at: Optional[float] = None
+_lock = threading.RLock()
+# Builds run on one background thread, never on the event loop
+_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wage-index")
+
+
+def _sync_version_locked(db: DBSession) -> None:
+    """Re-read the data version and active vintage. Caller holds _lock."""
+    global _data_version, _active_vintage_id, _version_checked_at
+
+    version = db.query(WageDataVersion.version).filter(WageDataVersion.id == 1).scalar() or 0
+    if version != _data_version:
+        if _data_version is not None:
+            logger.info(
+                f"Wage data changed (version {_data_version} -> {version}), refreshing wage indexes"
+            )
+        _vintage_ids.clear()
+        _data_version = version
+        _active_vintage_id = (
+            db.query(WageVintage.id).filter(WageVintage.is_active.is_(True)).scalar()
+        )
+    _version_checked_at = time.monotonic()
+
+
+def _ensure_current(db: DBSession) -> None:
+    """Check the data version at most once per VERSION_CHECK_INTERVAL_SECONDS"""
+    checked_at = _version_checked_at
+    if (
+        checked_at is not None
+        and time.monotonic() - checked_at < VERSION_CHECK_INTERVAL_SECONDS
+    ):
+        return
+    with _lock:
+        _sync_version_locked(db)
+
+
+def load(db: DBSession, vintage: WageVintage) -> WageIndex:
+    """Build the index of a vintage from the wage tables (one query per table)"""
+    started_at = time.perf_counter()
+
+    areas = {
+        area_id: WageAreaInfo(code=code, name=name)
+        for area_id, code, name in db.query(WageArea.id, WageArea.code, WageArea.name)
+    }
+    jobs = {
+        job_id: WageJobInfo(id=job_id, code=code, name=name, description=description)
+        for job_id, code, name, description in db.query(
+            WageJob.id, WageJob.code, WageJob.name, WageJob.description
+        )
+    }
+    # Sorted by the database and fetched in batches: long single C calls (a
+    # big sort or fetchall) would hold the GIL and stall the event loop
+    zip_areas = [
+        tuple(row)
+        for row in db.query(WageZipArea.zip, WageZipArea.area_id)
+        .filter(WageZipArea.vintage_id == vintage.id)
+        .order_by(WageZipArea.zip, WageZipArea.area_id)
+        .yield_per(LOAD_BATCH_SIZE)
+    ]
+    area_jobs = [
+        (area_id, job_id, float(tier_1), float(tier_2), float(tier_3), float(tier_4))
+        for area_id, job_id, tier_1, tier_2, tier_3, tier_4 in db.query(
+            WageAreaJob.area_id,
+            WageAreaJob.job_id,
+            WageAreaJob.wage_tier_1,
+            WageAreaJob.wage_tier_2,
+            WageAreaJob.wage_tier_3,
+            WageAreaJob.wage_tier_4,
+        )
+        .filter(WageAreaJob.vintage_id == vintage.id)
+        .order_by(WageAreaJob.area_id, WageAreaJob.job_id)
+        .yield_per(LOAD_BATCH_SIZE)
+    ]
+
+    index = WageIndex(vintage.id, vintage.name, areas, jobs, zip_areas, area_jobs)
+    logger.info(
+        f"Wage index for vintage {vintage.name} loaded in "
+        f"{time.perf_counter() - started_at:.2f}s: {len(areas)} areas, {len(jobs)} jobs, "
+        f"{len(index.zip_keys)} zip codes, {len(index)} area jobs"
+    )
+    return index
+
+
+def _build(bind, vintage_id: int) -> WageIndex:
+    """Load a vintage with its own session (runs on the loader thread) and swap it in"""
+    global _last_active
+
+    db = DBSession(bind=bind)
+    try:
+        # Read before the data: a change committed meanwhile bumps past this
+        # version, so the next check refreshes again rather than missing it
+        version = (
+            db.query(WageDataVersion.version).filter(WageDataVersion.id == 1).scalar() or 0
+        )
+        vintage = db.query(WageVintage).filter(WageVintage.id == vintage_id).first()
+        if vintage is None:
+            raise LookupError(f"Wage data vintage {vintage_id} not found")
+        index = load(db, vintage)
+        index.data_version = version
+    finally:
+        db.close()
+
+    with _lock:
+        _indexes[vintage_id] = index
+        _indexes.move_to_end(vintage_id)
+        if vintage_id == _active_vintage_id:
+            _last_active = index
+        # Evict the least recently used pinned vintage, never the active one
+        while len(_indexes) > MAX_VINTAGES:
+            evicted_id = next(
+                (
+                    cached_id
+                    for cached_id in _indexes
+                    if cached_id not in (_active_vintage_id, vintage_id)
+                ),
+                None,
+            )
+            if evicted_id is None:
+                break
+            del _indexes[evicted_id]
+    return index
+
+
+def _start_load_locked(db: DBSession, vintage_id: int) -> Future:
+    """The in-flight build of a vintage, started if needed. Caller holds _lock."""
+    future = _loads.get(vintage_id)
+    if future is None:
+        future = _loader.submit(_build, db.get_bind(), vintage_id)
+        _loads[vintage_id] = future
+
+        def done(finished: Future) -> None:
+            with _lock:
+                if _loads.get(vintage_id) is finished:
+                    del _loads[vintage_id]
+            if finished.exception() is not None:
+                logger.error(
+                    f"Wage index load for vintage {vintage_id} failed: {finished.exception()}"
+                )
+
+        future.add_done_callback(done)
+    return future
+
+
+def _index_or_load(db: DBSession, vintage_id: Optional[int]) -> WageIndex | Future:
+    """
+    The cached index of a vintage (the active one by default), or the Future
+    of its build when there is nothing to serve yet. A stale index (older
+    than the wage data version) is still served while its replacement builds,
+    and so is the previously active index while a newly activated one builds.
+    """
+    global _last_active
+
+    _ensure_current(db)
+
+    with _lock:
+        is_active = vintage_id is None or vintage_id == _active_vintage_id
+        if vintage_id is None:
+            vintage_id = _active_vintage_id
+            if vintage_id is None:
+                raise LookupError("No active wage data vintage")
+
+        index = _indexes.get(vintage_id)
+        if index is not None:
+            _indexes.move_to_end(vintage_id)
+            if index.data_version != _data_version:
+                _start_load_locked(db, vintage_id)
+            if is_active:
+                _last_active = index
+            return index
+
+        future = _start_load_locked(db, vintage_id)
+        if is_active and _last_active is not None:
+            return _last_active
+        return future
+
+
+def get_index(db: DBSession, vintage_id: Optional[int] = None) -> WageIndex:
+    """
+    The index of a vintage (the active one by default), waiting for it to
+    load if there is none to serve yet, so only for code off the event loop.
+    Raises LookupError when there is no active vintage or no such vintage.
+    """
+    index = _index_or_load(db, vintage_id)
+    if isinstance(index, Future):
+        return index.result()
+    return index
+
+
+async def get_index_async(db: DBSession, vintage_id: Optional[int] = None) -> WageIndex:
+    """get_index for async code: a first load is awaited without blocking the event loop"""
+    index = _index_or_load(db, vintage_id)
+    if isinstance(index, Future):
+        return await asyncio.wrap_future(index)
+    return index
+
+
+def get_vintage_id(db: DBSession, name: str) -> Optional[int]:
+    """Id of a vintage by name, None if there is no such vintage"""
+    _ensure_current(db)
+    vintage_id = _vintage_ids.get(name)
+    if vintage_id is None:
+        vintage_id = db.query(WageVintage.id).filter(WageVintage.name == name).scalar()
+        if vintage_id is not None:
+            _vintage_ids[name] = vintage_id
+    return vintage_id
+
+
+def clear() -> None:
+    """Drop all indexes, the next lookup reloads them"""
+    global _data_version, _active_vintage_id, _last_active, _version_checked_at
+    with _lock:
+        _indexes.clear()
+        _vintage_ids.clear()
+        _data_version = None
+        _active_vintage_id = None
+        _last_active = None
+        _version_checked_at = None
@@ -1,3 +1,4 @@
+from app.http_client import create_async_client, request_timeout
 import httpx
 import os
 import logging
@@ -6,15 +7,35 @@ logger = logging.getLogger("uvicorn.error")
 
 ONET_CLASSIFIER_LAMBDA_URL = os.getenv("ONET_CLASSIFIER_LAMBDA_URL")
 ONET_CLASSIFIER_LAMBDA_API_KEY = os.getenv("ONET_CLASSIFIER_LAMBDA_API_KEY")
+# Bump when the classifier model changes, so cached SOC inferences are redone
+ONET_CLASSIFIER_VERSION = os.getenv("ONET_CLASSIFIER_VERSION", "1")
 
 
 class OnetClassifierService:
     """Global service instance for ONET Classifier Lambda API operations"""
 
-    def __init__(self, url: str | None = None, api_key: str | None = None):
+    def __init__(
+        self, url: str | None = None, api_key: str | None = None, version: str = "1"
+    ):
         self.url = url
         self.api_key = api_key
+        self.version = version
         self.enabled = bool(url and api_key)
+        self._client: httpx.AsyncClient | None = None
+
+    def start(self):
+        """Open the pooled HTTP client (also opened lazily on first call)"""
+        if self._client is None or self._client.is_closed:
+            self._client = create_async_client(
+                verify=True,  # Verify SSL certificates
+                follow_redirects=True,  # Follow redirects from HTTP to HTTPS
+            )
+
+    async def close(self):
+        """Close the pooled HTTP client and its connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def infer_soc_code_from_document(
         self,
@@ -34,24 +55,23 @@ class OnetClassifierService:
             logger.info(f"ONET Classifier: Making request to {api_url}")
             logger.info(f"ONET Classifier: S3 file URL protocol: {file_url[:8]}")
 
-            async with httpx.AsyncClient(
-                timeout=timeout,
-                verify=True,  # Verify SSL certificates
-                follow_redirects=True,  # Follow redirects from HTTP to HTTPS
-            ) as client:
-                response = await client.post(
-                    api_url, json={"s3_file_url": file_url}, headers=headers
-                )
-                response.raise_for_status()
+            self.start()
+            response = await self._client.post(
+                api_url,
+                json={"s3_file_url": file_url},
+                headers=headers,
+                timeout=request_timeout(timeout),
+            )
+            response.raise_for_status()
 
-                # process output
-                response_data = response.json()
-                print(response_data)
+            # process output
+            response_data = response.json()
+            print(response_data)
 
-                if not response_data.get("onet_code"):
-                    raise Exception("ONET code not found in response")
+            if not response_data.get("onet_code"):
+                raise Exception("ONET code not found in response")
 
-                return response_data.get("onet_code", {})
+            return response_data.get("onet_code", {})
 
         except httpx.TimeoutException:
             raise Exception("Request to ONET Classifier Lambda timed out")
@@ -80,23 +100,22 @@ class OnetClassifierService:
 
             logger.info(f"ONET Classifier: Making request to {self.url}")
 
-            async with httpx.AsyncClient(
-                timeout=timeout,
-                verify=True,  # Verify SSL certificates
-                follow_redirects=True,  # Follow redirects from HTTP to HTTPS
-            ) as client:
-                response = await client.post(
-                    self.url, json={"job_description": job_description}, headers=headers
-                )
-                response.raise_for_status()
+            self.start()
+            response = await self._client.post(
+                self.url,
+                json={"job_description": job_description},
+                headers=headers,
+                timeout=request_timeout(timeout),
+            )
+            response.raise_for_status()
 
-                # process output
-                response_data = response.json()
+            # process output
+            response_data = response.json()
 
-                if not response_data.get("onet_code"):
-                    raise Exception("ONET code not found in response")
+            if not response_data.get("onet_code"):
+                raise Exception("ONET code not found in response")
 
-                return response_data.get("onet_code", {})
+            return response_data.get("onet_code", {})
 
         except httpx.TimeoutException:
             raise Exception("Request to ONET Classifier Lambda timed out")
@@ -112,5 +131,7 @@ class OnetClassifierService:
 
 # Global singleton instance
 onet_classifier_service = OnetClassifierService(
-    url=ONET_CLASSIFIER_LAMBDA_URL, api_key=ONET_CLASSIFIER_LAMBDA_API_KEY
+    url=ONET_CLASSIFIER_LAMBDA_URL,
+    api_key=ONET_CLASSIFIER_LAMBDA_API_KEY,
+    version=ONET_CLASSIFIER_VERSION,
 )
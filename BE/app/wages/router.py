@@ -3,7 +3,7 @@ import logging
 from fastapi import APIRouter, Depends, Query, HTTPException
 from app.auth.service import get_project_state
 from app.models import ProjectState
-from app.schemas import WageTierPublic
+from app.schemas import WageTierBatchPublic, WageTierBatchRequest, WageTierPublic
 from app.wages import service as wage_service
 
 logger = logging.getLogger("uvicorn.error")
@@ -16,21 +16,38 @@ router = APIRouter()
 async def get_tiers(
     zip_code: str = Query(..., min_length=5, max_length=5),
     soc_code: str = Query(..., alias="soc_code"),
+    vintage: str | None = Query(
+        None, description="Wage data vintage, defaults to the active one"
+    ),
     project_state: ProjectState = Depends(get_project_state),
 ):
     """Get wage tiers by zip code and SOC code"""
     wage_tier_public = await wage_service.get_tiers_by_zip_and_soc(
-        db=project_state.db, zip_code=zip_code, soc_code=soc_code
+        db=project_state.db, zip_code=zip_code, soc_code=soc_code, vintage=vintage
     )
     return wage_tier_public
 
 
+@router.post("/tiers/batch", response_model=WageTierBatchPublic)
+async def get_tiers_batch(
+    batch_request: WageTierBatchRequest,
+    project_state: ProjectState = Depends(get_project_state),
+):
+    """Get wage tiers for many zip code and SOC code pairs, with per-item errors"""
+    return await wage_service.get_tiers_batch(
+        db=project_state.db, items=batch_request.items, vintage=batch_request.vintage
+    )
+
+
 @router.get("", response_model=WageTierPublic)
 async def calculate_wage_tiers(
+    vintage: str | None = Query(
+        None, description="Wage data vintage, defaults to the active one"
+    ),
     project_state: ProjectState = Depends(get_project_state),
 ):
     """Get wage tiers from current project state"""
     wage_tier_public = await wage_service.get_tiers_from_current_project_state(
-        db=project_state.db, project=project_state.project
+        db=project_state.db, project=project_state.project, vintage=vintage
     )
     return wage_tier_public
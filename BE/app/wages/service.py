@@ -1,8 +1,14 @@
 from io import BytesIO
+import hashlib
 import os
 from fastapi import HTTPException
 from pypdf import PdfReader
-from app.documents.service import get_document_blob
+from sqlalchemy.exc import IntegrityError
+from app.documents.service import (
+    get_document_blob,
+    get_document_path,
+    hash_document_blob,
+)
 from app.documents.storage import S3_BUCKET
 import app.forms.service as form_service
 
@@ -11,20 +17,24 @@ from app.models import (
     FormTemplateField,
     FormFieldResponse,
     Project,
-    WageArea,
-    WageAreaJob,
-    WageJob,
     Document,
     DocumentType,
     Form,
-    WageZipArea,
+    SocInference,
 )
 from app.models import DBSession
-from app.schemas import WageTierLevelPublic, WageTierPublic
+from app.schemas import (
+    WageTierBatchItemPublic,
+    WageTierBatchPublic,
+    WageTierLevelPublic,
+    WageTierPublic,
+    WageTierQuery,
+)
 
 import logging
 
 from app.wages.onet_classifier_service import onet_classifier_service
+from app.wages import index as wage_index
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -32,7 +42,7 @@ S3_STORAGE = os.getenv("S3_STORAGE")
 
 
 async def get_tiers_from_current_project_state(
-    *, db: DBSession, project: Project
+    *, db: DBSession, project: Project, vintage: str | None = None
 ) -> WageTierPublic:
     print("--> Getting tiers from current project state")
 
@@ -95,7 +105,9 @@ async def get_tiers_from_current_project_state(
     print("--> Corrected soc_code", soc_code)
 
     # finally get the tiers for the SOC code via db lookup
-    tiers = await get_tiers_by_zip_and_soc(db=db, zip_code=zip_code, soc_code=soc_code)
+    tiers = await get_tiers_by_zip_and_soc(
+        db=db, zip_code=zip_code, soc_code=soc_code, vintage=vintage
+    )
 
     print("--> Annual salary", annual_salary)
 
@@ -150,112 +162,165 @@ async def get_job_description_document_from_document_type(
     return document
 
 
-async def get_job_description_from_document_type(
-    *, db: DBSession, project: Project, document_type_code: str
-) -> str:
-    document = (
-        db.query(Document)
-        .join(DocumentType, Document.inferred_type_id == DocumentType.id)
-        .filter(
-            Document.project_id == project.id, DocumentType.code == document_type_code
-        )
-        .first()
-    )
+def extract_pdf_text(file_bytes: bytes) -> str:
+    """Text of all pages of a PDF"""
+    pdf_file = BytesIO(file_bytes)
+    pdf_reader = PdfReader(pdf_file)
 
-    print("--> Document", document)
+    # Extract text from all pages
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
 
-    if not document:
-        raise HTTPException(
-            status_code=404, detail="Employment letter document not found"
-        )
-
-    # download the document blob from storage
-    file_bytes = await get_document_blob(document=document, project=project)
-
-    if not file_bytes:
-        raise HTTPException(
-            status_code=404,
-            detail="Employment letter document blob could not be downloaded",
-        )
+    all_text = text.strip()
 
-    # TODO probably should point the lambda directly to the file in S3 rather than passing the blob around
-
-    # Convert PDF bytes to text
-    try:
-        pdf_file = BytesIO(file_bytes)
-        pdf_reader = PdfReader(pdf_file)
+    print("--> All text", all_text)
 
-        # Extract text from all pages
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+    return all_text
 
-        all_text = text.strip()
 
-        print("--> All text", all_text)
+def get_soc_inferences(*, db: DBSession, content_sha256: str) -> list[SocInference]:
+    """Cached SOC inferences of a document content, for any classifier version"""
+    return (
+        db.query(SocInference)
+        .filter(SocInference.content_sha256 == content_sha256)
+        .all()
+    )
 
-        return all_text
 
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF: {e}")
-        return "Error: Could not extract text from PDF"
+def save_soc_inference(
+    *,
+    db: DBSession,
+    content_sha256: str,
+    soc_code: str,
+    job_description: str | None,
+) -> None:
+    inference = SocInference(
+        content_sha256=content_sha256,
+        classifier_version=onet_classifier_service.version,
+        soc_code=soc_code,
+        job_description=job_description,
+    )
+    db.add(inference)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request classified the same content concurrently
+        db.rollback()
+        logger.info(f"SOC inference for {content_sha256} already cached")
 
 
 async def get_soc_code_from_document(
     *, db: DBSession, project: Project, job_description_document: Document
 ) -> str:
-    if S3_STORAGE == "True":
-        # find the current job description document
-        job_description_document = (
-            await get_job_description_document_from_document_type(
-                db=db, project=project, document_type_code="employment_letter"
+    """
+    SOC code of the employment letter, inferred by the ONET classifier once per
+    document content and classifier version (soc_inference). Later calls for
+    the same content neither download the document nor call the classifier.
+    """
+    document = job_description_document
+    version = onet_classifier_service.version
+
+    file_bytes = None
+    if not document.content_sha256:
+        # Documents uploaded before content hashing get hashed on first use
+        try:
+            if S3_STORAGE == "True":
+                document.content_sha256 = await hash_document_blob(
+                    document=document, project=project
+                )
+            else:
+                file_bytes = await get_document_blob(document=document, project=project)
+                document.content_sha256 = hashlib.sha256(file_bytes).hexdigest()
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=404,
+                detail="Employment letter document blob could not be downloaded",
             )
-        )
+        db.commit()
+
+    inferences = get_soc_inferences(db=db, content_sha256=document.content_sha256)
+    for inference in inferences:
+        if inference.classifier_version == version:
+            logger.info(
+                f"Using cached SOC code {inference.soc_code} for document {document.public_id}"
+            )
+            return inference.soc_code
+    # Text extracted for an earlier classifier version saves the download
+    job_description = next(
+        (i.job_description for i in inferences if i.job_description), None
+    )
 
-        file_url = f"https://{S3_BUCKET}.s3.amazonaws.com/documents/{project.client.public_id}/{project.public_id}/uploads/{job_description_document.public_id}"
+    if S3_STORAGE == "True":
+        file_path = get_document_path(document=document, project=project)
+        file_url = f"https://{S3_BUCKET}.s3.amazonaws.com/{file_path}"
         print("--> File url", file_url)
 
         # infer the SOC code from the job description
         soc_code = await onet_classifier_service.infer_soc_code_from_document(
             file_url=file_url
         )
-
-        return soc_code
     else:
-        job_description = await get_job_description_from_document_type(
-            db=db, project=project, document_type_code="employment_letter"
-        )
+        if job_description is None:
+            if file_bytes is None:
+                file_bytes = await get_document_blob(document=document, project=project)
+
+            if not file_bytes:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Employment letter document blob could not be downloaded",
+                )
+
+            try:
+                job_description = extract_pdf_text(file_bytes)
+            except Exception as e:
+                logger.error(f"Error extracting text from PDF: {e}")
+                # Not cached, so the next call retries the extraction
+                return await onet_classifier_service.infer_soc_code_from_text(
+                    job_description="Error: Could not extract text from PDF"
+                )
+
         soc_code = await onet_classifier_service.infer_soc_code_from_text(
             job_description=job_description
         )
 
-        return soc_code
+    if soc_code:
+        save_soc_inference(
+            db=db,
+            content_sha256=document.content_sha256,
+            soc_code=soc_code,
+            job_description=job_description,
+        )
 
+    return soc_code
 
-async def get_tiers_by_zip_and_soc(
-    *, db: DBSession, zip_code: str, soc_code: str
-) -> WageTierPublic:
-    row = (
-        db.query(WageAreaJob, WageArea, WageJob)
-        .join(WageArea, WageAreaJob.area_id == WageArea.id)
-        .join(WageJob, WageAreaJob.job_id == WageJob.id)
-        .join(WageZipArea, WageArea.id == WageZipArea.area_id)
-        .filter(WageZipArea.zip == zip_code, WageJob.code == soc_code)
-        .first()
-    )
 
-    if row is None:
-        raise HTTPException(
-            status_code=404, detail="Wage tiers not found for zip code and SOC code"
-        )
+async def get_wage_index(
+    *, db: DBSession, vintage: str | None = None
+) -> wage_index.WageIndex:
+    """Wage index of a vintage by name, or of the active vintage"""
+    vintage_id = None
+    if vintage:
+        vintage_id = wage_index.get_vintage_id(db, vintage)
+        if vintage_id is None:
+            raise HTTPException(
+                status_code=404, detail=f"Wage data vintage {vintage} not found"
+            )
+    try:
+        return await wage_index.get_index_async(db, vintage_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-    area_job, area, job = row
+
+def _wage_tier_public(
+    index: wage_index.WageIndex, zip_code: str, row: wage_index.WageTiers
+) -> WageTierPublic:
+    area = index.areas[row.area_id]
+    job = index.jobs[row.job_id]
 
     levels = [
-        WageTierLevelPublic(level=1, wage=float(area_job.wage_tier_1), selected=False),
-        WageTierLevelPublic(level=2, wage=float(area_job.wage_tier_2), selected=False),
-        WageTierLevelPublic(level=3, wage=float(area_job.wage_tier_3), selected=False),
-        WageTierLevelPublic(level=4, wage=float(area_job.wage_tier_4), selected=False),
+        WageTierLevelPublic(level=level, wage=wage, selected=False)
+        for level, wage in enumerate(row.tiers, start=1)
     ]
 
     return WageTierPublic(
@@ -266,4 +331,47 @@ async def get_tiers_by_zip_and_soc(
         job_code=job.code,
         job_name=job.name,
         job_description=job.description,
+        vintage=index.vintage_name,
     )
+
+
+async def get_tiers_by_zip_and_soc(
+    *, db: DBSession, zip_code: str, soc_code: str, vintage: str | None = None
+) -> WageTierPublic:
+    index = await get_wage_index(db=db, vintage=vintage)
+    row = index.lookup(zip_code, soc_code)
+
+    if row is None:
+        raise HTTPException(
+            status_code=404, detail="Wage tiers not found for zip code and SOC code"
+        )
+
+    return _wage_tier_public(index, zip_code, row)
+
+
+async def get_tiers_batch(
+    *, db: DBSession, items: list[WageTierQuery], vintage: str | None = None
+) -> WageTierBatchPublic:
+    """
+    Wage tiers for many zip code and SOC code pairs, in request order. All
+    items are resolved against one index snapshot (so one vintage), and a
+    failed item gets an error instead of failing the batch.
+    """
+    index = await get_wage_index(db=db, vintage=vintage)
+
+    results = []
+    for item in items:
+        result = WageTierBatchItemPublic(zip_code=item.zip_code, soc_code=item.soc_code)
+        if not index.area_ids_for_zip(item.zip_code):
+            result.error = "Zip code not found"
+        elif index.job_id_for_soc(item.soc_code) is None:
+            result.error = "SOC code not found"
+        else:
+            row = index.lookup(item.zip_code, item.soc_code)
+            if row is None:
+                result.error = "Wage tiers not found for zip code and SOC code"
+            else:
+                result.tiers = _wage_tier_public(index, item.zip_code, row)
+        results.append(result)
+
+    return WageTierBatchPublic(vintage=index.vintage_name, results=results)
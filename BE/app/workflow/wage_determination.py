@@ -6,8 +6,9 @@ Handles SOC code classification and wage tier lookups with database caching
 import logging
 from typing import Dict, Any
 from sqlalchemy.orm import Session
-from app.models import ProjectDetailType, WageAreaJob, WageJob, WageZipArea
+from app.models import ProjectDetailType
 from app.projects.project_detail_service import save_project_detail, get_project_detail
+from app.wages import index as wage_index
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -25,8 +26,8 @@ async def process_wage_determination(
     1. Checks if we already have cached SOC code and wage tiers
     2. If cached, returns the cached data
     3. If not cached, calculates SOC code via ML classifier
-    4. Looks up wage tiers from database
-    5. Saves both to project_detail table for future use
+    4. Looks up wage tiers in the active wage data vintage
+    5. Saves both, and the vintage used, to project_detail table for future use
 
     Args:
         db: Database session
@@ -43,6 +44,7 @@ async def process_wage_determination(
                 "level_3": 105000.00,
                 "level_4": 125000.00
             },
+            "vintage": "FY2025",
             "from_cache": True/False
         }
     """
@@ -58,6 +60,7 @@ async def process_wage_determination(
         return {
             "soc_code": cached_soc,
             "wage_tiers": cached_wages,
+            "vintage": get_project_detail(db, project_id, ProjectDetailType.WAGE_VINTAGE),
             "from_cache": True
         }
 
@@ -71,17 +74,26 @@ async def process_wage_determination(
     # Step 4: Save SOC code to database immediately
     save_project_detail(db, project_id, ProjectDetailType.SOC_CODE, soc_code)
 
-    # Step 5: Lookup wage tiers from database
-    wage_tiers = lookup_wage_tiers_from_db(db, soc_code, zipcode)
-    logger.info(f"Retrieved wage tiers for SOC {soc_code} in {zipcode}")
-
-    # Step 6: Save wage tiers to database
+    # Step 5: Lookup wage tiers in the active vintage, pinned for this determination
+    try:
+        index = await wage_index.get_index_async(db)
+    except LookupError as e:
+        raise ValueError(str(e))
+    wage_tiers = lookup_wage_tiers_from_db(index, soc_code, zipcode)
+    logger.info(
+        f"Retrieved wage tiers for SOC {soc_code} in {zipcode} (vintage {index.vintage_name})")
+
+    # Step 6: Save wage tiers and their vintage to database, so the
+    # determination can be reproduced after newer wage data is activated
     save_project_detail(
         db, project_id, ProjectDetailType.WAGE_TIERS, wage_tiers)
+    save_project_detail(
+        db, project_id, ProjectDetailType.WAGE_VINTAGE, index.vintage_name)
 
     return {
         "soc_code": soc_code,
         "wage_tiers": wage_tiers,
+        "vintage": index.vintage_name,
         "from_cache": False
     }
 
@@ -105,13 +117,15 @@ async def classify_job_description(job_description: str) -> str:
     return "15-1252"  # Placeholder
 
 
-def lookup_wage_tiers_from_db(db: Session, soc_code: str, zipcode: str) -> Dict[str, float]:
+def lookup_wage_tiers_from_db(
+    index: wage_index.WageIndex, soc_code: str, zipcode: str
+) -> Dict[str, float]:
     """
-    Lookup wage tiers from your existing wage tables.
-    Uses WageZipArea, WageJob, and WageAreaJob tables.
+    Lookup wage tiers in an in-memory wage index snapshot (app/wages/index.py),
+    built from the WageZipArea, WageJob and WageAreaJob tables of one vintage.
 
     Args:
-        db: Database session
+        index: Wage index of the vintage to use, resolved once by the caller
         soc_code: SOC code like '15-1252'
         zipcode: 5-digit zip code
 
@@ -123,36 +137,24 @@ def lookup_wage_tiers_from_db(db: Session, soc_code: str, zipcode: str) -> Dict[
             "level_4": 125000.00
         }
     """
+    # Step 1: Find wage areas for this zipcode
+    area_ids = index.area_ids_for_zip(zipcode[:5])
 
-    # Step 1: Find wage area for this zipcode
-    zip_area = db.query(WageZipArea).filter(
-        WageZipArea.zip == zipcode[:5]
-    ).first()
-
-    if not zip_area:
+    if not area_ids:
         raise ValueError(f"No wage area found for zipcode: {zipcode}")
 
     # Step 2: Find job with this SOC code
-    job = db.query(WageJob).filter(
-        WageJob.code == soc_code
-    ).first()
-
-    if not job:
+    if index.job_id_for_soc(soc_code) is None:
         raise ValueError(f"No job found for SOC code: {soc_code}")
 
     # Step 3: Get wage data for this area and job
-    wage_data = db.query(WageAreaJob).filter(
-        WageAreaJob.area_id == zip_area.area_id,
-        WageAreaJob.job_id == job.id
-    ).first()
+    wage_data = index.lookup(zipcode[:5], soc_code)
 
     if not wage_data:
         raise ValueError(f"No wage data found for SOC {soc_code} in this area")
 
     # Step 4: Return wage tiers
     return {
-        "level_1": float(wage_data.wage_tier_1),
-        "level_2": float(wage_data.wage_tier_2),
-        "level_3": float(wage_data.wage_tier_3),
-        "level_4": float(wage_data.wage_tier_4)
+        f"level_{level}": wage
+        for level, wage in enumerate(wage_data.tiers, start=1)
     }
@@ -0,0 +1,98 @@
+"""
+Microbenchmark: compiled dependency expressions vs the legacy string-rewrite + eval path.
+
+Usage (from BE/):
+    uv run python -m benchmarks.dependency_eval [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+# The benchmark never touches the database, but importing app.models needs a URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.forms.pdf.dependency import (  # noqa: E402
+    FIELD_REFERENCE_PATTERN,
+    compile_dependency,
+    convert_string_to_proper_type,
+)
+
+EXPRESSIONS = [
+    "{Petitioner.HasFEIN} == 'Yes'",
+    "{Beneficiary.InUS} == 'Yes' && {Beneficiary.StatusExpired} == 'No'",
+    "{Job.Salary.Annual} >= 60000 || {Job.FullTime} == true",
+    "({Beneficiary.Dependents} > 0 && {Beneficiary.Married} == 'Yes') || {Job.Title} != 'Intern'",
+]
+
+RAW_VALUES = {
+    "Petitioner.HasFEIN": "yes",
+    "Beneficiary.InUS": "Yes",
+    "Beneficiary.StatusExpired": "no",
+    "Job.Salary.Annual": "85000",
+    "Job.FullTime": "true",
+    "Beneficiary.Dependents": "2",
+    "Beneficiary.Married": "No",
+    "Job.Title": "Engineer",
+}
+
+
+def legacy_check(expression: str, raw_values: dict) -> bool:
+    """Copy of the previous check_dependency + evaluate_dependency_safe path."""
+    field_values = {
+        ref: convert_string_to_proper_type(raw_values.get(ref))
+        for ref in FIELD_REFERENCE_PATTERN.findall(expression)
+    }
+    processed = expression
+    for ref, value in field_values.items():
+        if isinstance(value, str):
+            escaped = f"'{value}'"
+        else:
+            escaped = str(value)
+        processed = processed.replace(f"{{{ref}}}", escaped)
+
+    allowed_names = {
+        "True": True, "False": False, "None": None, "true": True,
+        "false": False, "null": None, "Yes": True, "No": False,
+    }
+    safe = processed.replace("'Yes'", "True").replace("'No'", "False")
+    safe = safe.replace("||", " or ").replace("&&", " and ")
+    safe = safe.replace(">=", "___GTE___").replace("<=", "___LTE___")
+    safe = safe.replace("!=", "___NE___").replace("==", "___EQ___")
+    safe = safe.replace(">", " > ").replace("<", " < ")
+    safe = safe.replace("___GTE___", " >= ").replace("___LTE___", " <= ")
+    safe = safe.replace("___NE___", " != ").replace("___EQ___", " == ")
+    try:
+        return bool(eval(safe, {"__builtins__": {}}, allowed_names))
+    except Exception:
+        return False
+
+
+def main(iterations: int = 20000):
+    compiled = [compile_dependency(expression) for expression in EXPRESSIONS]
+    typed_values = {
+        key: convert_string_to_proper_type(value) for key, value in RAW_VALUES.items()
+    }
+
+    # Both paths must agree before timing them
+    for expression, dependency in zip(EXPRESSIONS, compiled):
+        assert legacy_check(expression, RAW_VALUES) == dependency.evaluate(typed_values)
+
+    legacy_time = timeit.timeit(
+        lambda: [legacy_check(expression, RAW_VALUES) for expression in EXPRESSIONS],
+        number=iterations,
+    )
+    compiled_time = timeit.timeit(
+        lambda: [dependency.evaluate(typed_values) for dependency in compiled],
+        number=iterations,
+    )
+
+    checks = iterations * len(EXPRESSIONS)
+    print(f"{checks} dependency checks")
+    print(f"  legacy eval path:   {legacy_time * 1e6 / checks:8.2f} us/check")
+    print(f"  compiled closures:  {compiled_time * 1e6 / checks:8.2f} us/check")
+    print(f"  speedup:            {legacy_time / compiled_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,152 @@
+"""
+Benchmark: per-call httpx client (previous VisionService/OnetClassifierService)
+vs the shared pooled client, against a local stub Lambda.
+
+The stub is a minimal ASGI app served by uvicorn on 127.0.0.1, answering like
+the Vision and ONET classifier Lambdas. It is plain HTTP, so the gap measured
+here is connection setup only; against the real HTTPS endpoints every
+per-call client also pays a TLS handshake. Usage (from BE/):
+    uv run python -m benchmarks.http_client_pool [calls]
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+# The benchmark never touches the database, but app settings expect a URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.documents.vision_service import VisionService  # noqa: E402
+from app.wages.onet_classifier_service import OnetClassifierService  # noqa: E402
+
+PAYLOAD = os.urandom(32 * 1024)
+VISION_RESPONSE = json.dumps(
+    {
+        "classification": {"classification_result": "us_passport"},
+        "extraction": {"extraction_result": {"surname": "DOE"}},
+    }
+).encode()
+ONET_RESPONSE = json.dumps({"onet_code": "15-1252.00"}).encode()
+
+
+async def stub_lambda(scope, receive, send):
+    """Answer every POST like the Lambdas do: /vision and /onet"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    more_body = True
+    while more_body:
+        message = await receive()
+        more_body = message.get("more_body", False)
+    body = VISION_RESPONSE if scope["path"].startswith("/vision") else ONET_RESPONSE
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def legacy_vision(url: str) -> dict:
+    """Copy of the previous VisionService.send_document: a new client per call"""
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.post(
+            url,
+            files={"file": ("passport.pdf", PAYLOAD, "application/pdf")},
+            data={"document_keys": "[]"},
+            headers={"X-Api-Key": "bench"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+async def legacy_onet(url: str) -> dict:
+    """Copy of the previous OnetClassifierService.infer_soc_code_from_text"""
+    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        response = await client.post(
+            url, json={"job_description": "Software developer"}, headers={"X-Api-Key": "bench"}
+        )
+        response.raise_for_status()
+        return response.json()["onet_code"]
+
+
+async def timed(label: str, calls: int, call, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await call()
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - started_at
+    print(f"  {label:<14} concurrency={concurrency:<3} {elapsed * 1000 / calls:8.2f} ms/call")
+
+
+async def main(calls: int = 500):
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(stub_lambda, host="127.0.0.1", port=port, log_level="warning")
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    base_url = f"http://127.0.0.1:{port}"
+    vision = VisionService(url=f"{base_url}/vision", api_key="bench", max_concurrency=16)
+    onet = OnetClassifierService(url=f"{base_url}/onet", api_key="bench")
+    vision.start()
+    onet.start()
+    try:
+        print(f"{calls} calls per run, {len(PAYLOAD) // 1024} KiB vision uploads")
+        for concurrency in (1, 16):
+            await timed(
+                "vision legacy",
+                calls,
+                lambda: legacy_vision(f"{base_url}/vision"),
+                concurrency,
+            )
+            await timed(
+                "vision pooled",
+                calls,
+                lambda: vision.send_document("passport.pdf", PAYLOAD, "application/pdf"),
+                concurrency,
+            )
+            await timed(
+                "onet legacy", calls, lambda: legacy_onet(f"{base_url}/onet"), concurrency
+            )
+            await timed(
+                "onet pooled",
+                calls,
+                lambda: onet.infer_soc_code_from_text("Software developer"),
+                concurrency,
+            )
+    finally:
+        await vision.close()
+        await onet.close()
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
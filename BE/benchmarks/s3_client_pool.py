@@ -0,0 +1,90 @@
+"""
+Benchmark: per-call S3 client (previous S3Storage) vs the shared pooled client.
+
+Needs an S3-compatible endpoint, e.g. moto (`moto_server -p 5000`) or a local
+MinIO container. Usage (from BE/):
+    S3_ENDPOINT_URL=http://127.0.0.1:5000 uv run python -m benchmarks.s3_client_pool [operations]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# The benchmark never touches the database, but app settings expect a URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import aioboto3  # noqa: E402
+
+from app.documents.storage import S3Storage  # noqa: E402
+
+ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "http://127.0.0.1:5000")
+BUCKET = os.getenv("S3_BENCHMARK_BUCKET", "storage-benchmark")
+PAYLOAD = os.urandom(64 * 1024)
+
+
+async def legacy_round_trip(session, key: str) -> bytes:
+    """Copy of the previous S3Storage: a new client per operation"""
+    async with session.client("s3", endpoint_url=ENDPOINT_URL) as s3_client:
+        await s3_client.put_object(Bucket=BUCKET, Key=key, Body=PAYLOAD)
+    async with session.client("s3", endpoint_url=ENDPOINT_URL) as s3_client:
+        response = await s3_client.get_object(Bucket=BUCKET, Key=key)
+        async with response["Body"] as stream:
+            return await stream.read()
+
+
+async def pooled_round_trip(storage: S3Storage, key: str) -> bytes:
+    await storage.save_file(PAYLOAD, key)
+    return await storage.get_file(key)
+
+
+async def timed(label: str, operations: int, round_trip, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            assert await round_trip(f"bench/{label}/{i}") == PAYLOAD
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(operations)))
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"  {label:<8} concurrency={concurrency:<3} "
+        f"{elapsed * 1000 / operations:8.2f} ms/round trip"
+    )
+
+
+async def main(operations: int = 200):
+    session = aioboto3.Session()
+    async with session.client("s3", endpoint_url=ENDPOINT_URL) as s3_client:
+        try:
+            await s3_client.create_bucket(Bucket=BUCKET)
+        except s3_client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+    storage = S3Storage(BUCKET, session, endpoint_url=ENDPOINT_URL)
+    await storage.start()
+    try:
+        print(f"{operations} PUT+GET round trips of {len(PAYLOAD) // 1024} KiB")
+        for concurrency in (1, 16):
+            await timed(
+                "legacy",
+                operations,
+                lambda key: legacy_round_trip(session, key),
+                concurrency,
+            )
+            await timed(
+                "pooled",
+                operations,
+                lambda key: pooled_round_trip(storage, key),
+                concurrency,
+            )
+    finally:
+        await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
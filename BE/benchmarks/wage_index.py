@@ -0,0 +1,167 @@
+"""
+Microbenchmark: in-memory wage tier index vs the previous four-table join.
+
+Fills an in-memory SQLite database with synthetic OFLC-sized wage data, checks
+that both paths agree, then times lookups. SQLite in-process is far cheaper
+than a query to Postgres over the network, so the join numbers are a lower
+bound. Usage (from BE/):
+    uv run python -m benchmarks.wage_index [lookups]
+"""
+
+import datetime
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models import (  # noqa: E402
+    WageArea,
+    WageAreaJob,
+    WageDataVersion,
+    WageJob,
+    WageVintage,
+    WageZipArea,
+)
+from app.wages import index as wage_index  # noqa: E402
+
+AREAS = 600
+JOBS = 800
+ZIPS = 40000
+JOBS_PER_AREA = 400
+VINTAGE_ID = 1
+
+
+def legacy_lookup(db, zip_code: str, soc_code: str):
+    """Copy of the previous get_tiers_by_zip_and_soc query, scoped to a vintage"""
+    row = (
+        db.query(WageAreaJob, WageArea, WageJob)
+        .join(WageArea, WageAreaJob.area_id == WageArea.id)
+        .join(WageJob, WageAreaJob.job_id == WageJob.id)
+        .join(WageZipArea, WageArea.id == WageZipArea.area_id)
+        .filter(
+            WageZipArea.zip == zip_code,
+            WageJob.code == soc_code,
+            WageZipArea.vintage_id == VINTAGE_ID,
+            WageAreaJob.vintage_id == VINTAGE_ID,
+        )
+        .order_by(WageArea.id)
+        .first()
+    )
+    if row is None:
+        return None
+    area_job, _, _ = row
+    return (
+        float(area_job.wage_tier_1),
+        float(area_job.wage_tier_2),
+        float(area_job.wage_tier_3),
+        float(area_job.wage_tier_4),
+    )
+
+
+def seed(db, rng: random.Random) -> list[tuple[str, str]]:
+    db.execute(insert(WageDataVersion), [{"id": 1, "version": 1}])
+    db.execute(
+        insert(WageVintage), [{"id": VINTAGE_ID, "name": "bench", "is_active": True}]
+    )
+    db.execute(
+        insert(WageArea),
+        [{"id": i, "code": f"A{i:05d}", "name": f"Area {i}"} for i in range(1, AREAS + 1)],
+    )
+    db.execute(
+        insert(WageJob),
+        [
+            {"id": j, "code": f"{10 + j // 100}-{j:04d}", "name": f"Job {j}", "description": "..."}
+            for j in range(1, JOBS + 1)
+        ],
+    )
+    zips = [f"{z:05d}" for z in rng.sample(range(1000, 99999), ZIPS)]
+    zip_rows = []
+    for zip_code in zips:
+        for area_id in rng.sample(range(1, AREAS + 1), rng.choice((1, 1, 1, 2))):
+            zip_rows.append(
+                {"vintage_id": VINTAGE_ID, "zip": zip_code, "area_id": area_id}
+            )
+    db.execute(insert(WageZipArea), zip_rows)
+    area_job_rows = []
+    for area_id in range(1, AREAS + 1):
+        for job_id in rng.sample(range(1, JOBS + 1), JOBS_PER_AREA):
+            base = rng.randint(30000, 120000)
+            area_job_rows.append(
+                {
+                    "vintage_id": VINTAGE_ID,
+                    "area_id": area_id,
+                    "job_id": job_id,
+                    "wage_tier_1": base,
+                    "wage_tier_2": base * 1.2,
+                    "wage_tier_3": base * 1.4,
+                    "wage_tier_4": base * 1.6,
+                }
+            )
+    db.execute(insert(WageAreaJob), area_job_rows)
+    db.commit()
+    return [
+        (rng.choice(zips), f"{10 + j // 100}-{j:04d}")
+        for j in (rng.randint(1, JOBS) for _ in range(10000))
+    ]
+
+
+def main(lookups: int = 2000):
+    # One shared connection, so the index loader thread sees the seeded data
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _functions(connection, _):
+        connection.create_function(
+            "now", 0, lambda: datetime.datetime.now(datetime.timezone.utc).isoformat()
+        )
+
+    Base.metadata.create_all(
+        engine,
+        tables=[
+            WageArea.__table__,
+            WageZipArea.__table__,
+            WageJob.__table__,
+            WageAreaJob.__table__,
+            WageDataVersion.__table__,
+            WageVintage.__table__,
+        ],
+    )
+    db = sessionmaker(bind=engine)()
+    queries = seed(db, random.Random(42))[:lookups]
+
+    started_at = time.perf_counter()
+    index = wage_index.get_index(db)
+    print(f"index load: {time.perf_counter() - started_at:.2f}s for {len(index)} area jobs")
+
+    for zip_code, soc_code in queries[:500]:
+        row = index.lookup(zip_code, soc_code)
+        assert (row.tiers if row else None) == legacy_lookup(db, zip_code, soc_code)
+
+    started_at = time.perf_counter()
+    for zip_code, soc_code in queries:
+        legacy_lookup(db, zip_code, soc_code)
+    legacy = (time.perf_counter() - started_at) / len(queries)
+
+    started_at = time.perf_counter()
+    for zip_code, soc_code in queries:
+        wage_index.get_index(db).lookup(zip_code, soc_code)
+    indexed = (time.perf_counter() - started_at) / len(queries)
+
+    print(f"{len(queries)} lookups")
+    print(f"  join   {legacy * 1e6:10.1f} us/lookup")
+    print(f"  index  {indexed * 1e6:10.1f} us/lookup")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
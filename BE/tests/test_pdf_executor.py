@@ -0,0 +1,42 @@
+import asyncio
+import os
+
+import pytest
+
+from app.forms.pdf import executor
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    monkeypatch.setattr(executor, "PDF_RENDER_EXECUTOR", "process")
+    monkeypatch.setattr(executor, "PDF_RENDER_WORKERS", 1)
+    executor.shutdown()
+    yield
+    executor.shutdown()
+
+
+def test_pool_recovers_after_render_process_dies(process_pool):
+    async def scenario():
+        # The render process exits mid-render, like an OOM kill
+        with pytest.raises(executor.RenderPoolBrokenError):
+            await executor.run(os._exit, 1)
+        # The next render gets a fresh pool
+        return await executor.run(pow, 2, 10)
+
+    assert asyncio.run(scenario()) == 1024
+    assert executor._pending == 0
+
+
+def test_pool_broken_outside_a_render_is_replaced_on_submit(process_pool):
+    broken = executor.start()
+    with pytest.raises(executor.BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    async def scenario():
+        # Submitting to the broken pool fails, and replaces it
+        with pytest.raises(executor.RenderPoolBrokenError):
+            await executor.run(pow, 3, 2)
+        assert executor.start() is not broken
+        return await executor.run(pow, 3, 2)
+
+    assert asyncio.run(scenario()) == 9